@@ -4,6 +4,7 @@ import os
 from bottle import route, view, run, request, post, template
 import network_construction.network as nc
 import network_construction.database as db
+from network_construction import algorithm
 from network_analysis import network
 from data_platform.config import ConfigManager
 from data_platform.datasource.networkx import NetworkXDS
@@ -222,4 +223,6 @@ def do_analysis():
     return data
 
 
+# 启动时加载分词、词性标注等模型，避免第一个请求等待
+algorithm.get_pipeline().warm_up()
 run(host='localhost', port=8080, reloader=True, debug=True)
@@ -0,0 +1,30 @@
+"""Helpers shared by the network_construction benchmarks."""
+
+import time
+from pathlib import Path
+from typing import Callable, List
+
+from data_platform.config import ConfigManager
+from data_platform.datasource.science_direct import ScienceDirectDS
+from network_construction.algorithm import NLPPipeline
+
+
+def load_sentences(location: Path, pipeline: NLPPipeline) -> List[str]:
+    """The sentences of every document in a folder of ScienceDirect xml files, split by `pipeline`."""
+    ds = ScienceDirectDS(ConfigManager({"init": {"location": location}}))
+    sentences: List[str] = []
+    for doc in ds.read_docset().values():
+        sentences.extend(pipeline.split_sentence(doc.get_text()))
+    return sentences
+
+
+def throughput(func: Callable[[], object], count: int, repeat: int) -> float:
+    """Best sentences per second of `repeat` runs."""
+    best = min(timed(func) for _ in range(repeat))
+    return count / best
+
+
+def timed(func: Callable[[], object]) -> float:
+    start = time.perf_counter()
+    func()
+    return time.perf_counter() - start
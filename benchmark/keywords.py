@@ -0,0 +1,48 @@
+"""Benchmark keyword extraction, a new Rake per sentence and one shared Rake against KeywordExtractor.
+
+Also checks that KeywordExtractor returns the same keywords as Rake for every sentence.
+Needs the nltk data used by network_construction (punkt, stopwords).
+
+usage: python -m benchmark.keywords <xml folder>
+"""
+
+import argparse
+from pathlib import Path
+from typing import List
+
+from rake_nltk import Rake
+
+from benchmark.common import load_sentences, throughput
+from network_construction.algorithm import KeywordExtractor, NLPPipeline
+
+
+def rake_keywords(rake: Rake, text: str) -> List[str]:
+    rake.extract_keywords_from_text(text)
+    return list(rake.get_word_degrees().keys())
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('location', type=Path, help='folder of ScienceDirect xml files')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best is reported')
+    args = parser.parse_args()
+
+    sentences = load_sentences(args.location, NLPPipeline())
+    print(f'{len(sentences)} sentences')
+
+    rake = Rake()
+    extractor = KeywordExtractor()
+    mismatches = sum(rake_keywords(rake, sentence) != keywords
+                     for sentence, keywords in zip(sentences, extractor.keywords_many(sentences)))
+    print(f'sentences with different keywords: {mismatches}')
+
+    baseline = throughput(lambda: [rake_keywords(Rake(), sentence) for sentence in sentences], len(sentences), args.repeat)
+    print(f'new Rake per sentence : {baseline:10.0f} sentences/s')
+    shared = throughput(lambda: [rake_keywords(rake, sentence) for sentence in sentences], len(sentences), args.repeat)
+    print(f'shared Rake           : {shared:10.0f} sentences/s ({shared / baseline:.1f}x)')
+    result = throughput(lambda: extractor.keywords_many(sentences), len(sentences), args.repeat)
+    print(f'KeywordExtractor      : {result:10.0f} sentences/s ({result / baseline:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""Benchmark noun phrase extraction, TextBlob against the trained chunker on the shared POS tags.
+
+Measures TextBlob(sentence).noun_phrases per sentence (the original path), one shared FastNPExtractor,
+and the chunker alone on tags that are already computed, then reports how well the chunker agrees with TextBlob.
+Needs the nltk data used by network_construction (punkt, averaged_perceptron_tagger, brown, and conll2000
+to train the chunker on first use).
+
+usage: python -m benchmark.noun_phrases <xml folder>
+"""
+
+import argparse
+from collections import Counter
+from pathlib import Path
+from typing import List, Tuple
+
+from textblob import TextBlob
+
+from benchmark.common import load_sentences, throughput
+from network_construction.algorithm import NLPPipeline
+
+
+def agreement(expected: List[List[str]], found: List[List[str]]) -> Tuple[float, float, float, float]:
+    """Precision, recall and F1 of the phrases found against the expected ones, and the share of identical sentences."""
+    true_positive = expected_count = found_count = same = 0
+    for expected_phrases, found_phrases in zip(expected, found):
+        expected_counter, found_counter = Counter(expected_phrases), Counter(found_phrases)
+        true_positive += sum((expected_counter & found_counter).values())
+        expected_count += len(expected_phrases)
+        found_count += len(found_phrases)
+        same += expected_counter == found_counter
+    precision = true_positive / found_count if found_count else 1.0
+    recall = true_positive / expected_count if expected_count else 1.0
+    f1 = 2 * precision * recall / (precision + recall) if precision + recall else 0.0
+    return precision, recall, f1, same / len(expected) if expected else 1.0
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('location', type=Path, help='folder of ScienceDirect xml files')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best is reported')
+    args = parser.parse_args()
+
+    textblob = NLPPipeline().warm_up()
+    chunker = NLPPipeline(np_backend="chunker").warm_up()
+    sentences = load_sentences(args.location, textblob)
+    tagged = textblob.pos_tag_sents([textblob.word_tokenize(sentence) for sentence in sentences])
+    print(f'{len(sentences)} sentences')
+
+    expected = [textblob.noun_phrases(sentence) for sentence in sentences]
+    found = [chunker.chunk_noun_phrases(tags) for tags in tagged]
+    precision, recall, f1, same = agreement(expected, found)
+    print(f'chunker against TextBlob: precision {precision:.3f}, recall {recall:.3f}, F1 {f1:.3f}, identical sentences {same:.1%}')
+
+    baseline = throughput(lambda: [TextBlob(sentence).noun_phrases for sentence in sentences], len(sentences), args.repeat)
+    print(f'TextBlob per sentence   : {baseline:10.0f} sentences/s')
+    shared = throughput(lambda: [textblob.noun_phrases(sentence) for sentence in sentences], len(sentences), args.repeat)
+    print(f'shared FastNPExtractor  : {shared:10.0f} sentences/s ({shared / baseline:.1f}x)')
+    result = throughput(lambda: [chunker.chunk_noun_phrases(tags) for tags in tagged], len(sentences), args.repeat)
+    print(f'chunker on shared tags  : {result:10.0f} sentences/s ({result / baseline:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
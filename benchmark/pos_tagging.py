@@ -0,0 +1,37 @@
+"""Benchmark POS tagging, nltk.pos_tag per sentence against NLPPipeline.pos_tag_sents.
+
+Needs the nltk data used by network_construction (punkt, averaged_perceptron_tagger).
+
+usage: python -m benchmark.pos_tagging <xml folder>
+"""
+
+import argparse
+from pathlib import Path
+
+import nltk
+
+from benchmark.common import load_sentences, throughput
+from network_construction.algorithm import NLPPipeline
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('location', type=Path, help='folder of ScienceDirect xml files')
+    parser.add_argument('--repeat', type=int, default=3, help='runs per measurement, the best is reported')
+    args = parser.parse_args()
+
+    pipeline = NLPPipeline().warm_up()
+    sentences = [pipeline.word_tokenize(sentence) for sentence in load_sentences(args.location, pipeline)]
+    print(f'{len(sentences)} sentences, {sum(map(len, sentences))} tokens')
+
+    mismatches = sum(nltk.pos_tag(words) != tagged for words, tagged in zip(sentences, pipeline.pos_tag_sents(sentences)))
+    print(f'sentences with different tags: {mismatches}')
+
+    baseline = throughput(lambda: [nltk.pos_tag(words) for words in sentences], len(sentences), args.repeat)
+    print(f'nltk.pos_tag per sentence: {baseline:10.0f} sentences/s')
+    result = throughput(lambda: pipeline.pos_tag_sents(sentences), len(sentences), args.repeat)
+    print(f'pos_tag_sents            : {result:10.0f} sentences/s ({result / baseline:.1f}x)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,47 @@
+"""Benchmark cold (xml parsing) and warm (on-disk cache) loads of ScienceDirectDS.
+
+usage: python -m benchmark.science_direct_cache <xml folder> [--cache <cache folder>]
+"""
+
+import argparse
+import shutil
+import tempfile
+import time
+from pathlib import Path
+
+from data_platform.config import ConfigManager
+from data_platform.datasource.science_direct import ScienceDirectDS
+
+
+def load_all(location: Path, cache_location: Path) -> float:
+    start = time.perf_counter()
+    ds = ScienceDirectDS(ConfigManager({"init": {"location": location, "cache_location": cache_location}}))
+    ds.read_doc()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('location', type=Path, help='folder of ScienceDirect xml files')
+    parser.add_argument('--cache', type=Path, default=None, help='cache folder, a temporary one is used by default')
+    parser.add_argument('--repeat', type=int, default=3, help='number of warm loads')
+    args = parser.parse_args()
+
+    cache_location = args.cache or Path(tempfile.mkdtemp(prefix='sd_cache_'))
+    try:
+        shutil.rmtree(cache_location, ignore_errors=True)
+        cold = load_all(args.location, cache_location)
+        warm = min(load_all(args.location, cache_location) for _ in range(args.repeat))
+
+        info = ScienceDirectDS(ConfigManager({"init": {"location": args.location, "cache_location": cache_location}})).cache_info()
+        print(f'cold load: {cold:.3f}s')
+        print(f'warm load: {warm:.3f}s (best of {args.repeat})')
+        print(f'speedup:   {cold / warm:.1f}x')
+        print(f'cache:     {info.entries} entries, {info.size / 1024 / 1024:.1f} MiB')
+    finally:
+        if args.cache is None:
+            shutil.rmtree(cache_location, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
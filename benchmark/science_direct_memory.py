@@ -0,0 +1,53 @@
+"""Benchmark peak memory of the 'tree' and 'iterparse' parsers of ScienceDirectDS.
+
+Every parser runs in a fresh interpreter, so the peak resident sizes do not affect each other.
+
+usage: python -m benchmark.science_direct_memory <xml folder or file>
+"""
+
+import argparse
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from data_platform.datasource.science_direct import ScienceDirectDS
+
+
+def max_rss() -> int:
+    """Peak resident size of the current process in KiB."""
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # bytes on macOS, KiB elsewhere
+    return usage // 1024 if sys.platform == 'darwin' else usage
+
+
+def measure(location: Path, parser: str) -> None:
+    """Parse every file one by one without keeping the results, print baseline and peak KiB and seconds."""
+    xmlfiles = ScienceDirectDS.xml_files(location) if location.is_dir() else [location]
+    baseline = max_rss()
+    start = time.perf_counter()
+    for xmlfile in xmlfiles:
+        ScienceDirectDS._parse_file(xmlfile, parser == 'iterparse')
+    print(baseline, max_rss(), time.perf_counter() - start)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('location', type=Path, help='folder of ScienceDirect xml files, or one file')
+    parser.add_argument('--measure', choices=ScienceDirectDS.PARSERS, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.location, args.measure)
+        return
+
+    for name in ScienceDirectDS.PARSERS:
+        output = subprocess.run([sys.executable, '-W', 'ignore', '-m', __spec__.name, str(args.location), '--measure', name],
+                                stdout=subprocess.PIPE, check=True, universal_newlines=True).stdout
+        baseline, peak, seconds = output.split()
+        print(f'{name:<9}: peak +{(int(peak) - int(baseline)) / 1024:.1f} MiB, {float(seconds):.3f}s')
+
+
+if __name__ == '__main__':
+    main()
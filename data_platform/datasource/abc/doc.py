@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from typing import Any, Dict, List, NamedTuple, Optional, Text, Tuple, Union
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Text, Tuple, Union
 
 from . import BaseDataSource, ConditionDict
 from ...config import ConfigManager
@@ -90,6 +90,27 @@ class DocDataSource(BaseDataSource):
             return DocumentSet({d_k: self._factory.pack(d) for d_k, d in self.read_doc(key).items()})
         raise AttributeError('There is no factory to form document set!')
 
+    def iter_docs(self, key: DocKeyType = DocKeyPair('@*', '@*'),
+                  batch_size: int = 64) -> Iterator[Tuple[DocKeyPair, DocValDict]]:  # pylint: disable=unused-argument
+        """Yield (key, doc) pairs, fetching about `batch_size` docs at a time.
+
+        Data sources override this to stream; the default reads all docs at once.
+        """
+        yield from self.read_doc(key).items()
+
+    def iter_docset(self, key: DocKeyType = DocKeyPair('@*', '@*'), batch_size: int = 64,
+                    factory: Optional[DocFactory] = None) -> Iterator[Tuple[DocKeyPair, Document]]:
+        """Yield (key, Document) pairs, packing each doc only when it is reached."""
+        if factory is None:
+            factory = self._factory
+        if factory is None:
+            raise AttributeError('There is no factory to form documents!')
+
+        for d_k, d in self.iter_docs(key, batch_size):
+            doc = factory.pack(d)
+            doc.id_ = d_k
+            yield d_k, doc
+
     @abstractmethod
     def update_doc(self, key: DocKeyType, val: DocValDict) -> List[DocKeyPair]:
         pass
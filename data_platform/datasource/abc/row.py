@@ -1,5 +1,5 @@
 from abc import abstractmethod
-from typing import Any, Dict, List, NamedTuple, Text, Union
+from typing import Any, Dict, Iterator, List, NamedTuple, Text, Tuple, Union
 
 from . import BaseDataSource, ConditionDict
 
@@ -24,6 +24,13 @@ class RowDataSource(BaseDataSource):
     def read_row(self, key: RowKeyType) -> Dict[RowKeyPair, RowValDict]:
         pass
 
+    def iter_rows(self, key: RowKeyType, batch_size: int = 64) -> Iterator[Tuple[RowKeyPair, RowValDict]]:  # pylint: disable=unused-argument
+        """Yield (key, row) pairs, fetching about `batch_size` rows at a time.
+
+        Data sources override this to stream; the default reads all rows at once.
+        """
+        yield from self.read_row(key).items()
+
     @abstractmethod
     def update_row(self, key: RowKeyType, val: RowValDict) -> List[RowKeyPair]:
         pass
@@ -2,7 +2,7 @@
 
 import json
 from pathlib import Path
-from typing import Dict, Iterable, List, NoReturn, Optional, Set, Text
+from typing import Dict, Iterable, Iterator, List, NoReturn, Optional, Set, Text, Tuple
 
 from ..config import ConfigManager
 from .abc.doc import DocDataSource, DocKeyPair, DocKeyType, DocValDict
@@ -135,6 +135,13 @@ class JSONDS(DocDataSource):
                     result[DocKeyPair(ds, d)] = self._data[ds][d]
         return result
 
+    def iter_docs(self, key: DocKeyType = WILDCARD_DOC_KEY, batch_size: int = 64) -> Iterator[Tuple[DocKeyPair, DocValDict]]:
+        # docs are in memory already, yield them without building a result dict
+        for ds, d in self._filter(key):
+            if ds in self._data:
+                if d in self._data[ds]:
+                    yield DocKeyPair(ds, d), self._data[ds][d]
+
     def update_doc(self, key: DocKeyType = DEFAULT_DOC_KEY, val: Optional[DocValDict] = None) -> List[DocKeyPair]:
         if val is None:
             val = {}
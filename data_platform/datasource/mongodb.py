@@ -1,4 +1,4 @@
-from typing import Dict, List, Text, Union
+from typing import Dict, Iterator, List, Text, Tuple, Union
 import logging
 
 from ..config import ConfigManager
@@ -107,6 +107,26 @@ class MongoDBDS(DocDataSource):
 
         return result
 
+    def iter_docs(self, key: DocKeyType = WILDCARD_DOC_KEY, batch_size: int = 64) -> Iterator[Tuple[DocKeyPair, DocValDict]]:
+        '''逐个返回(key, doc)。通配的文档名直接用cursor分批（batch_size）读取，不会一次性载入整个collection。'''
+        for docset_name, doc_name, _ in self._format_doc_key(key):
+            if docset_name.startswith('@*'):
+                docsets = self._mongodb.list_collection_names()
+            else:
+                docsets = [docset_name]
+
+            for ds in docsets:
+                collection: pymongo.collection.Collection = self._mongodb[ds]
+                if doc_name.startswith('@*'):
+                    cursor = collection.find({'_doc_name': {'$exists': True}}, batch_size=batch_size)
+                else:
+                    cursor = collection.find({'_doc_name': doc_name}, limit=1)
+
+                for doc in cursor:
+                    d = doc.pop('_doc_name')
+                    del doc['_id']
+                    yield DocKeyPair(ds, d), doc
+
     def update_doc(self, key: DocKeyType = DEFAULT_DOC_KEY, val: DocValDict = None) -> List[DocKeyPair]:
         if val is None:
             val = {}
@@ -1,14 +1,14 @@
 """data source class for graph storage with NetworkX."""
 
 from pathlib import Path
-from typing import Dict, List, NoReturn, Optional, Set, Tuple
+from typing import Dict, Iterable, List, NoReturn, Optional, Set, Tuple
 
 import networkx as nx
 
 from ..config import ConfigManager
 from .abc.base import ConditionDict
 from .abc.graph import (EdgeKeyPair, EdgeKeyType, EdgeNamePair, EdgeValDict, GraphDataSource, GraphKeyType, GraphNameType, GraphType, GraphValType, NodeKeyPair,
-                        NodeKeyType, NodeValDict)
+                        NodeKeyType, NodeNameType, NodeValDict)
 from .exception import NotSupportedError
 
 
@@ -290,6 +290,28 @@ class NetworkXDS(GraphDataSource):
 
         return results
 
+    def create_nodes_from(self, graph_name: GraphNameType, nodes: Iterable[Tuple[NodeNameType, NodeValDict]]) -> int:
+        """Add nodes with their own attributes to one graph in a single call.
+
+        Attributes of nodes already in the graph are updated, like `create_node`.
+        Return the number of nodes given.
+        """
+        nodes = list(nodes)
+        self._data[graph_name].add_nodes_from(nodes)
+        self._dirty_bits.add(graph_name)
+        return len(nodes)
+
+    def create_edges_from(self, graph_name: GraphNameType, edges: Iterable[Tuple[NodeNameType, NodeNameType, EdgeValDict]]) -> int:
+        """Add edges with their own attributes to one graph in a single call.
+
+        Attributes of edges already in the graph are updated, like `create_edge`.
+        Return the number of edges given.
+        """
+        edges = list(edges)
+        self._data[graph_name].add_edges_from(edges)
+        self._dirty_bits.add(graph_name)
+        return len(edges)
+
     def read_graph(self, key: GraphKeyType = "@*") -> Dict[GraphNameType, GraphType]:
         target = self._filter_graph(key)
 
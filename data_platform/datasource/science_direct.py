@@ -1,12 +1,16 @@
 """Data source class for reading ScienceDirect XML response."""
 
+import hashlib
 import os
+import pickle
 import sys
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from pathlib import Path
-from typing import Any, Dict, List, NoReturn, Optional, Text, Tuple
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, NoReturn, Optional, Set, Text, Tuple
 
-from defusedxml.lxml import parse as etree_parse
+from defusedxml.lxml import RestrictedElement, check_docinfo, parse as etree_parse
 from lxml import etree
 
 from .. import document as _doc
@@ -19,9 +23,8 @@ from .exception import NotSupportedError
 class ScienceDirectFactory(DocFactory):
     @classmethod
     def pack(cls, doc_dict: DocValDict) -> Document:
-        # root
+        # root, built when the body is first accessed
         root = doc_dict["root"]
-        root_node = _doc.Root.from_dict(root)
 
         # metadata
         meta_out = {}
@@ -31,7 +34,7 @@ class ScienceDirectFactory(DocFactory):
             meta = metadata["meta"]
             meta_out[meta_name] = _doc.MetaData.from_dict(meta)
 
-        return Document(root_node, meta_out)
+        return _doc.LazyDocument(root, meta_out)
 
     @classmethod
     def unpack(cls, doc: Document) -> DocValDict:
@@ -49,23 +52,100 @@ class ScienceDirectFactory(DocFactory):
         return result
 
 
+# errors of a malformed file, recorded instead of raised
+PARSE_ERRORS = (ValueError, AttributeError, KeyError, etree.LxmlError)
+
+# the parts of a document the streaming parser extracts, in document order
+STREAM_PARTS = ('coredata', 'sections', 'bibliography')
+
+
+class CacheInfo(NamedTuple):
+    entries: int
+    size: int
+
+
+class FileStat(NamedTuple):
+    path: Path
+    size: int
+    mtime_ns: int
+
+
+class ChangeSet(NamedTuple):
+    added: List[Text]
+    modified: List[Text]
+    deleted: List[Text]
+
+
 class ScienceDirectDS(DocDataSource):
     """Data source class for reading ScienceDirect XML response."""
 
+    CACHE_SUFFIX = '.pickle'
+    PARSERS = ('tree', 'iterparse')
+
     def __init__(self, config: ConfigManager, *args, **kwargs) -> None:
+        """Initialize the data source.
+
+        `config` schema:
+        - 'init': initialize parameters
+            - 'location': the folder of xml files, searched recursively
+            - 'cache_location': (optional) the folder for parsed documents,
+              reused across processes until the xml file changes
+            - 'workers': (optional) number of processes parsing xml files,
+              0 or 1 parses in the current process (default), None uses every core;
+              the pool is started on first use, kept for later reads and shut down by `close`
+            - 'chunksize': (optional) number of files sent to a worker at once
+            - 'auto_refresh': (optional) rescan the folder before every read,
+              True by default, otherwise call `refresh` explicitly
+            - 'parser': (optional) 'tree' builds the whole xml tree (default),
+              'iterparse' streams it to bound the memory of very large files
+
+        """
         super().__init__(config, *args, **kwargs)
 
         path = Path(config.check_get(["init", "location"]))
+        cache_location = config["init"].get("cache_location")
+        workers = config["init"].get("workers", 0)
+        chunksize = config["init"].get("chunksize", 16)
+        auto_refresh = config["init"].get("auto_refresh", True)
+        parser = config["init"].get("parser", "tree")
+        if parser not in self.PARSERS:
+            raise ValueError(f"Unknown parser: {parser}, should be one of {', '.join(self.PARSERS)}.")
 
         self._path = path
-        self._mtime = 0.0
+        self._auto_refresh: bool = auto_refresh
         self._factory: Optional[DocFactory] = ScienceDirectFactory()
+        self._index: Dict[Text, FileStat] = {}
         self._data: Dict[Text, Dict] = {}
+        self._errors: Dict[Text, Text] = {}
+        self._cache_path: Optional[Path] = None
+        self._workers: int = workers if workers is not None else os.cpu_count() or 1
+        self._chunksize: int = chunksize
+        self._iterparse: bool = parser == 'iterparse'
+        self._executor: Optional[ProcessPoolExecutor] = None
 
-        self._load()
+        if cache_location is not None:
+            self._cache_path = Path(cache_location)
+            self._cache_path.mkdir(parents=True, exist_ok=True)
+
+        self.refresh()
+
+    def __del__(self) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """Shut down the parsing processes, a later read starts them again."""
+        executor, self._executor = getattr(self, '_executor', None), None
+        if executor is not None:
+            executor.shutdown()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self._workers)
+        return self._executor
 
     @staticmethod
-    def _xml_files(path: Path) -> List[Path]:
+    def xml_files(path: Path) -> List[Path]:
+        """The xml files under `path`, searched recursively."""
         if not path.exists():
             raise ValueError(f"The source path is not exist: {str(path)}")
 
@@ -106,18 +186,140 @@ class ScienceDirectDS(DocDataSource):
             raise ValueError(f'Query {query} has no result.')
         return result[0]
 
-    def _load(self) -> None:
-        mtime = os.path.getmtime(self._path)
+    def _scan(self) -> Dict[Text, FileStat]:
+        result: Dict[Text, FileStat] = {}
+        for xmlfile in self.xml_files(self._path):
+            stat = xmlfile.stat()
+            result[xmlfile.stem] = FileStat(xmlfile, stat.st_size, stat.st_mtime_ns)
+        return result
+
+    def refresh(self) -> ChangeSet:
+        """Rescan the folder and forget parsed documents whose files are modified or deleted.
+
+        Files are parsed on demand by `_parse_docs`, so the cost after a refresh
+        is proportional to the added and modified files that are read.
+        """
+        manifest = self._scan()
+
+        added = [doc_name for doc_name in manifest if doc_name not in self._index]
+        modified = [doc_name for doc_name, file_stat in manifest.items() if doc_name in self._index and self._index[doc_name] != file_stat]
+        deleted = [doc_name for doc_name in self._index if doc_name not in manifest]
+
+        for doc_name in modified + deleted:
+            self._data.pop(doc_name, None)
+            self._errors.pop(doc_name, None)
+        self._index = manifest
+
+        return ChangeSet(added, modified, deleted)
+
+    def _load_docs(self, doc_names: Iterable[Text]) -> Dict[Text, DocValDict]:
+        """Get the indexed documents from memory, the parse cache or by parsing, without keeping them.
+
+        Files that fail to parse are recorded in `parse_errors` and not retried until they change.
+        """
+        result: Dict[Text, DocValDict] = {}
+        todo: List[Text] = []
+        for doc_name in doc_names:
+            if doc_name in self._data:
+                result[doc_name] = self._data[doc_name]
+                continue
+            if doc_name in self._errors or doc_name not in self._index:
+                continue
+
+            cached = self._read_cache(self._index[doc_name])
+            if cached is not None:
+                result[doc_name] = cached
+            else:
+                todo.append(doc_name)
+
+        file_stats = [self._index[doc_name] for doc_name in todo]
+        xmlfiles = [file_stat.path for file_stat in file_stats]
+        if self._workers > 1 and len(xmlfiles) > 1:
+            executor = self._get_executor()
+            results = list(executor.map(self._parse_file, xmlfiles, repeat(self._iterparse), chunksize=self._chunksize))
+        else:
+            results = [self._parse_file(xmlfile, self._iterparse) for xmlfile in xmlfiles]
+
+        for doc_name, file_stat, (doc_dict, error) in zip(todo, file_stats, results):
+            if doc_dict is None:
+                self._errors[doc_name] = f"Parsing file {str(file_stat.path.name)} error: {error}"
+            else:
+                result[doc_name] = doc_dict
+                self._write_cache(file_stat, doc_dict)
+
+        return result
+
+    def _parse_docs(self, doc_names: Iterable[Text]) -> None:
+        """Parse and keep the indexed documents which are not parsed yet."""
+        self._data.update(self._load_docs(doc_names))
+
+    @property
+    def parse_errors(self) -> Dict[Text, Text]:
+        """Error messages of the files that failed to parse, by document name."""
+        return self._errors
 
-        if mtime != self._mtime:
-            # the directory is new, reload
-            self._mtime = mtime
-            for xmlfile in self._xml_files(self._path):
-                try:
-                    parsed = self._parse_one(xmlfile)
-                    self._data[xmlfile.stem] = ScienceDirectFactory.unpack(parsed)
-                except ValueError as e:
-                    print(f"Parsing file {str(xmlfile.name)} error: ", e, file=sys.stderr)
+    @classmethod
+    def _parse_file(cls, xmlfile: Path, iterparse: bool = False) -> Tuple[Optional[DocValDict], Optional[Text]]:
+        """Parse one file into an unpacked dict, runs in worker processes as well."""
+        parse_one = cls._iterparse_one if iterparse else cls._parse_one
+        try:
+            return ScienceDirectFactory.unpack(parse_one(xmlfile)), None
+        except PARSE_ERRORS as e:
+            return None, str(e)
+
+    @classmethod
+    def _cache_key(cls, file_stat: FileStat) -> Text:
+        """Key of a parsed file, changes whenever the file is moved, resized or touched."""
+        raw_key = f'{file_stat.path.resolve()}\0{file_stat.size}\0{file_stat.mtime_ns}'
+        return hashlib.sha1(raw_key.encode('utf-8')).hexdigest() + cls.CACHE_SUFFIX
+
+    def _read_cache(self, file_stat: FileStat) -> Optional[DocValDict]:
+        if self._cache_path is None:
+            return None
+
+        cache_file = self._cache_path / self._cache_key(file_stat)
+        if not cache_file.exists():
+            return None
+
+        try:
+            with cache_file.open('rb') as f:
+                return pickle.load(f)
+        except (OSError, EOFError, pickle.UnpicklingError):
+            # broken entry (e.g. interrupted write), parse again
+            return None
+
+    def _write_cache(self, file_stat: FileStat, doc_dict: DocValDict) -> None:
+        if self._cache_path is None:
+            return
+
+        cache_file = self._cache_path / self._cache_key(file_stat)
+        tmp_file = cache_file.with_name(f'{cache_file.name}.{os.getpid()}.tmp')
+        with tmp_file.open('wb') as f:
+            pickle.dump(doc_dict, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_file, cache_file)
+
+    def cache_info(self) -> CacheInfo:
+        """Number of entries and total bytes of the on-disk parse cache."""
+        if self._cache_path is None:
+            return CacheInfo(0, 0)
+
+        sizes = [cache_file.stat().st_size for cache_file in self._cache_path.glob('*' + self.CACHE_SUFFIX)]
+        return CacheInfo(len(sizes), sum(sizes))
+
+    def prune_cache(self) -> int:
+        """Delete cache entries of files which are changed or removed, return the number deleted."""
+        if self._cache_path is None:
+            return 0
+
+        self.refresh()
+        alive: Set[Text] = {self._cache_key(file_stat) for file_stat in self._index.values()}
+
+        result = 0
+        for cache_file in self._cache_path.glob('*' + self.CACHE_SUFFIX):
+            if cache_file.name not in alive:
+                cache_file.unlink()
+                result += 1
+        return result
 
     @staticmethod
     def _tag_without_ns(tag: Text) -> Text:
@@ -126,9 +328,13 @@ class ScienceDirectDS(DocDataSource):
             return tag[end + 1:]
         return tag
 
-    def _parse_body(self, body: etree.ElementBase) -> Tuple[List[_doc.Section], Dict[Text, List[Element]]]:
+    @classmethod
+    def _parse_body(cls, body: etree.ElementBase) -> Tuple[List[_doc.Section], Dict[Text, List[Element]]]:
+        return cls._parse_sections(cls._find_one_with_ns(body, 'ce:sections'))
+
+    @classmethod
+    def _parse_sections(cls, sections: etree.ElementBase) -> Tuple[List[_doc.Section], Dict[Text, List[Element]]]:
         bibid2para: Dict[Text, List[Element]] = defaultdict(list)
-        sections = self._find_one_with_ns(body, 'ce:sections')
         nsmap = sections.nsmap
         sec_list: List[_doc.Section] = []
         for sec in sections.iterfind('ce:section', nsmap):
@@ -144,7 +350,7 @@ class ScienceDirectDS(DocDataSource):
                 para_elem = _doc.Paragraph([], **para.attrib)
 
                 for child in para:
-                    raw_tag = self._tag_without_ns(child.tag)
+                    raw_tag = cls._tag_without_ns(child.tag)
 
                     attrib = {**child.attrib}
 
@@ -179,80 +385,84 @@ class ScienceDirectDS(DocDataSource):
             sec_list.append(sec_elem)
         return sec_list, bibid2para
 
-    def _parse_tail(self, tail: etree.ElementBase) -> _doc.MetaData:
-        bib = self._find_one_with_ns(tail, 'ce:bibliography')
+    @classmethod
+    def _parse_tail(cls, tail: etree.ElementBase) -> _doc.MetaData:
+        return cls._parse_bibliography(cls._find_one_with_ns(tail, 'ce:bibliography'))
+
+    @classmethod
+    def _parse_bibliography(cls, bib: etree.ElementBase) -> _doc.MetaData:
         attr = {**bib.attrib}
 
         # section-title
-        title = self._find_one_with_ns(bib, 'ce:section-title')
+        title = cls._find_one_with_ns(bib, 'ce:section-title')
         title_attr = {**title.attrib}
         title_attr['text'] = title.text.rstrip()
         attr['section-title'] = title_attr
 
         # bib-sec
-        bib_sec = self._find_one_with_ns(bib, 'ce:bibliography-sec')
+        bib_sec = cls._find_one_with_ns(bib, 'ce:bibliography-sec')
         bibsec_attr = {**bib_sec.attrib}
         nsmap = bib_sec.nsmap
         refs: Dict[str, Dict] = {}
         for bib_ref in bib_sec.iterfind('ce:bib-reference', nsmap):
             ref_dict = {**bib_ref.attrib}
-            label = self._find_one_with_ns(bib_ref, 'ce:label')
+            label = cls._find_one_with_ns(bib_ref, 'ce:label')
             ref_dict['label'] = label.text.strip()
-            refs_ = self._find_with_ns(bib_ref, 'sb:reference')
+            refs_ = cls._find_with_ns(bib_ref, 'sb:reference')
 
             if refs_:
                 # author and title
-                contribs = self._find_with_ns(refs_[0], 'sb:contribution')
+                contribs = cls._find_with_ns(refs_[0], 'sb:contribution')
                 if contribs:
                     contrib = contribs[0]
                     ref_dict['authors'] = []
-                    authors = self._find_with_ns(contrib, 'sb:authors')
+                    authors = cls._find_with_ns(contrib, 'sb:authors')
                     if authors:
                         for author in authors[0].iterfind('sb:author', nsmap):
                             author_dict: Dict[str, str] = {}
                             for child in author:
-                                author_dict[self._tag_without_ns(child.tag)] = child.text.strip()
+                                author_dict[cls._tag_without_ns(child.tag)] = child.text.strip()
                             ref_dict['authors'].append(author_dict)
 
-                    ref_titles = self._find_with_ns(contrib, 'sb:title')
+                    ref_titles = cls._find_with_ns(contrib, 'sb:title')
                     if ref_titles:
                         title_dict: Dict[str, str] = {}
                         for child in ref_titles[0]:
-                            title_dict[self._tag_without_ns(child.tag)] = child.text.strip()
+                            title_dict[cls._tag_without_ns(child.tag)] = child.text.strip()
                         ref_dict['title'] = title_dict
 
                     # series and pages
-                host = self._find_one_with_ns(refs_[0], 'sb:host')
+                host = cls._find_one_with_ns(refs_[0], 'sb:host')
                 for host_child in host:
-                    tag = self._tag_without_ns(host_child.tag)
+                    tag = cls._tag_without_ns(host_child.tag)
                     if tag.endswith('issue'):
                         issue = host_child
 
-                        series = self._find_with_ns(issue, 'sb:series')
+                        series = cls._find_with_ns(issue, 'sb:series')
                         for series_child in series:
-                            raw_tag = self._tag_without_ns(series_child.tag)
+                            raw_tag = cls._tag_without_ns(series_child.tag)
                             if raw_tag.endswith('title'):
                                 issue_title_dict: Dict[str, str] = {}
                                 for child in series_child:
-                                    issue_title_dict[self._tag_without_ns(child.tag)] = child.text.strip()
+                                    issue_title_dict[cls._tag_without_ns(child.tag)] = child.text.strip()
                                 ref_dict['host_title'] = issue_title_dict
                             else:
-                                ref_dict[self._tag_without_ns(series_child.tag)] = series_child.text.strip()
+                                ref_dict[cls._tag_without_ns(series_child.tag)] = series_child.text.strip()
 
-                        date = self._find_one_with_ns(issue, 'sb:date')
+                        date = cls._find_one_with_ns(issue, 'sb:date')
                         ref_dict['date'] = date.text.strip()
                     elif tag.endswith('pages'):
                         pages = host_child
                         pages_dict: Dict[Text, Text] = {}
                         for page_child in pages:
-                            pages_dict[self._tag_without_ns(page_child.tag)] = page_child.text.strip()
+                            pages_dict[cls._tag_without_ns(page_child.tag)] = page_child.text.strip()
                         ref_dict['pages'] = pages_dict
                     else:
-                        ref_dict[self._tag_without_ns(host_child.tag)] = host_child.text.strip()
+                        ref_dict[cls._tag_without_ns(host_child.tag)] = host_child.text.strip()
 
-            other_ref = self._find_with_ns(bib_ref, 'ce:other-ref')
+            other_ref = cls._find_with_ns(bib_ref, 'ce:other-ref')
             if other_ref:
-                textref = self._find_one_with_ns(other_ref[0], 'ce:textref')
+                textref = cls._find_one_with_ns(other_ref[0], 'ce:textref')
                 ref_dict['textref'] = textref.text.strip()
 
             refs[ref_dict['id']] = ref_dict
@@ -262,31 +472,20 @@ class ScienceDirectDS(DocDataSource):
 
         return _doc.MetaData(attr)
 
-    def _parse_one(self, xmlfile: Path) -> Document:
-        tree = etree_parse(str(xmlfile))
-        root = tree.getroot()
-
-        doc_meta = {}
-
-        # coredata
-        coredata = self._find_one_with_ns(root, 'coredata')
+    @classmethod
+    def _parse_coredata(cls, coredata: etree.ElementBase) -> _doc.MetaData:
         coredata_attr = {}
         for child in coredata:
             text = child.text
-            coredata_attr[self._tag_without_ns(child.tag)] = text.strip() if text else ""
-        coremeta = _doc.MetaData(coredata_attr)
-        doc_meta['coredata'] = coremeta
+            coredata_attr[cls._tag_without_ns(child.tag)] = text.strip() if text else ""
+        return _doc.MetaData(coredata_attr)
 
-        # originalText
-        ot = self._find_one_with_ns(root, 'originalText')
-        articles = self._xpath(ot, '//*[local-name() = $name]', name='article')
-        if not articles:
-            raise ValueError('There is no article.')
-        article = articles[0]
+    @staticmethod
+    def _make_doc(coremeta: _doc.MetaData, sec_list: List[_doc.Section],
+                  bib2elem: Dict[Text, List[Element]], references: _doc.MetaData) -> Document:
+        doc_meta = {}
+        doc_meta['coredata'] = coremeta
 
-        # body
-        body = self._find_one_with_ns(article, 'body')
-        sec_list, bib2elem = self._parse_body(body)
         doc_root = _doc.Root(sec_list)
 
         # root created, id setted
@@ -296,19 +495,130 @@ class ScienceDirectDS(DocDataSource):
         bibid2para = _doc.MetaData(bib2para)
         doc_meta['bib2para'] = bibid2para
 
-        # tail
-        tail = self._find_one_with_ns(article, 'tail')
-        references = self._parse_tail(tail)
         doc_meta['references'] = references
 
         return Document(doc_root, doc_meta)
 
+    @classmethod
+    def _parse_one(cls, xmlfile: Path) -> Document:
+        tree = etree_parse(str(xmlfile))
+        root = tree.getroot()
+
+        # coredata
+        coredata = cls._find_one_with_ns(root, 'coredata')
+        coremeta = cls._parse_coredata(coredata)
+
+        # originalText
+        ot = cls._find_one_with_ns(root, 'originalText')
+        articles = cls._xpath(ot, '//*[local-name() = $name]', name='article')
+        if not articles:
+            raise ValueError('There is no article.')
+        article = articles[0]
+
+        # body
+        body = cls._find_one_with_ns(article, 'body')
+        sec_list, bib2elem = cls._parse_body(body)
+
+        # tail
+        tail = cls._find_one_with_ns(article, 'tail')
+        references = cls._parse_tail(tail)
+
+        return cls._make_doc(coremeta, sec_list, bib2elem, references)
+
+    @classmethod
+    def iterparse_parts(cls, xmlfile: Path, parts: Iterable[Text] = STREAM_PARTS) -> Dict[Text, Any]:
+        """Parse the requested parts of one file without holding the whole tree in memory.
+
+        `parts` are taken from `STREAM_PARTS`: 'coredata' gives the coredata `MetaData`,
+        'sections' the sections and bibliography ids as `_parse_body`, 'bibliography' the
+        references `MetaData`. Only these elements are kept until they end and are parsed,
+        every other element is cleared and detached from its parent as soon as it ends,
+        and reading stops once every requested part is found.
+        """
+        todo = set(parts)
+        result: Dict[Text, Any] = {}
+        article: Optional[etree.ElementBase] = None
+        target: Optional[Text] = None
+        depth = 0
+
+        context = etree.iterparse(str(xmlfile), events=('start', 'end'), resolve_entities=False, no_network=True)
+        context.set_element_class_lookup(etree.ElementDefaultClassLookup(element=RestrictedElement))
+        for event, elem in context:
+            if event == 'start':
+                if depth:
+                    depth += 1
+                    continue
+
+                parent = elem.getparent()
+                if parent is None:
+                    check_docinfo(elem.getroottree())
+                    continue
+
+                name = cls._tag_without_ns(elem.tag)
+                if name == 'article':
+                    if article is None:
+                        article = elem
+                elif name not in todo:
+                    pass
+                elif name == 'coredata':
+                    if parent.getparent() is None:
+                        target = name
+                elif name == 'sections':
+                    if parent.getparent() is article and cls._tag_without_ns(parent.tag) == 'body':
+                        target = name
+                elif name == 'bibliography':
+                    if parent.getparent() is article and cls._tag_without_ns(parent.tag) == 'tail':
+                        target = name
+                if target is not None:
+                    depth = 1
+                continue
+
+            if depth > 1:
+                depth -= 1
+                continue
+
+            if depth == 1 and target is not None:
+                if target == 'coredata':
+                    result[target] = cls._parse_coredata(elem)
+                elif target == 'sections':
+                    result[target] = cls._parse_sections(elem)
+                else:
+                    result[target] = cls._parse_bibliography(elem)
+                todo.discard(target)
+                target = None
+                depth = 0
+                if not todo:
+                    break
+
+            # the element and its earlier siblings are finished
+            elem.clear()
+            parent = elem.getparent()
+            if parent is not None:
+                while elem.getprevious() is not None:
+                    del parent[0]
+
+        for part in STREAM_PARTS:
+            if part not in todo:
+                continue
+            if part == 'coredata':
+                raise ValueError('There is no coredata.')
+            if article is None:
+                raise ValueError('There is no article.')
+            raise ValueError(f'There is no ce:{part}.')
+
+        return result
+
+    @classmethod
+    def _iterparse_one(cls, xmlfile: Path) -> Document:
+        """Parse one file like `_parse_one` by streaming it, see `iterparse_parts`."""
+        parts = cls.iterparse_parts(xmlfile)
+        sec_list, bib2elem = parts['sections']
+        return cls._make_doc(parts['coredata'], sec_list, bib2elem, parts['bibliography'])
+
     def create_doc(self, key: DocKeyType, val: DocValDict) -> NoReturn:
         raise NotSupportedError("ScienceDirectDS is read-only.")
 
-    def read_doc(self, key: DocKeyType = DocKeyPair('@*', '@*')) -> Dict[DocKeyPair, DocValDict]:
-        self._load()
-
+    def _doc_names(self, key: DocKeyType) -> List[Text]:
         ds_d_c: List[Tuple] = self._format_doc_key(key)
 
         doc_names = set()
@@ -317,15 +627,39 @@ class ScienceDirectDS(DocDataSource):
                 print("Warning: ScienceDirectDS doesn't support multi-documentsets, all but '_default' will be converted to '@*'.", file=sys.stderr)
 
             if doc_name.startswith('@*'):
-                for d_name in self._data:
+                for d_name in self._index:
                     # TODO: doc wildcards and filters
                     doc_names.add(d_name)
             else:
                 doc_names.add(doc_name)
 
-        result = {DocKeyPair('_default', doc_name): self._data[doc_name] for doc_name in doc_names}
+        return sorted(doc_names)
+
+    def read_doc(self, key: DocKeyType = DocKeyPair('@*', '@*')) -> Dict[DocKeyPair, DocValDict]:
+        if self._auto_refresh:
+            self.refresh()
+
+        doc_names = self._doc_names(key)
+
+        # only the requested files are parsed, the others stay as index entries
+        self._parse_docs(doc_names)
+
+        result = {DocKeyPair('_default', doc_name): self._data[doc_name] for doc_name in doc_names if doc_name in self._data}
         return result
 
+    def iter_docs(self, key: DocKeyType = DocKeyPair('@*', '@*'), batch_size: int = 64) -> Iterator[Tuple[DocKeyPair, DocValDict]]:
+        """Parse and yield `batch_size` documents at a time, parsed documents are not kept in memory."""
+        if self._auto_refresh:
+            self.refresh()
+
+        doc_names = self._doc_names(key)
+        for start in range(0, len(doc_names), batch_size):
+            batch = doc_names[start:start + batch_size]
+            docs = self._load_docs(batch)
+            for doc_name in batch:
+                if doc_name in docs:
+                    yield DocKeyPair('_default', doc_name), docs[doc_name]
+
     def update_doc(self, key: DocKeyType, val: DocValDict) -> NoReturn:
         raise NotSupportedError("ScienceDirectDS is read-only.")
 
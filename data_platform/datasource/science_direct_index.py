@@ -0,0 +1,178 @@
+"""Metadata index over a folder of ScienceDirect XML response, stored in sqlite.
+
+Only coredata and bibliography are stored. The files are streamed by `ScienceDirectDS.iterparse_parts`
+and the sections are parsed only to be checked, so a file is indexed exactly when the full parse accepts it,
+and the index serves the same documents as `ScienceDirectDS.read_doc`.
+"""
+
+import json
+import sqlite3
+from collections import OrderedDict
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Generator, Iterable, List, NamedTuple, Optional, Text, Tuple
+
+from .science_direct import PARSE_ERRORS, STREAM_PARTS, ChangeSet, FileStat, ScienceDirectDS
+
+
+class PaperMeta(NamedTuple):
+    doi: Optional[Text]
+    title: Optional[Text]
+    creator: Optional[Text]
+    year: Optional[Text]
+    # {ref_id: reference dict}, the same dicts as the bibliography of the parsed document
+    references: Dict[Text, Dict]
+
+
+class ScienceDirectIndex:
+    """Persistent index of paper and reference metadata, updated per file by size and mtime."""
+
+    SCHEMA = (
+        "CREATE TABLE IF NOT EXISTS papers("
+        "stem TEXT PRIMARY KEY, path TEXT, size INTEGER, mtime_ns INTEGER, "
+        "doi TEXT, title TEXT, creator TEXT, year TEXT, error TEXT)",
+        "CREATE TABLE IF NOT EXISTS refs("
+        "stem TEXT, position INTEGER, ref_id TEXT, data TEXT, "
+        "PRIMARY KEY(stem, position))",
+    )
+    # stored as the sqlite user_version, an index of another version is rebuilt from the xml files;
+    # version 3 records the files the full parse rejects as errors
+    SCHEMA_VERSION = 3
+
+    def __init__(self, location: Path, index_location: Path) -> None:
+        """Open (or create) the index file `index_location` of the xml folder `location`.
+
+        Call `update` to bring the index up to date with the folder, or with the documents about to be read.
+        """
+        self._path = Path(location)
+        self._loc = Path(index_location)
+        self._loc.parent.mkdir(parents=True, exist_ok=True)
+
+        with self.connect() as conn:
+            if conn.execute('PRAGMA user_version').fetchone()[0] != self.SCHEMA_VERSION:
+                conn.execute('DROP TABLE IF EXISTS papers')
+                conn.execute('DROP TABLE IF EXISTS refs')
+                conn.execute(f'PRAGMA user_version = {self.SCHEMA_VERSION}')
+            for statement in self.SCHEMA:
+                conn.execute(statement)
+            conn.commit()
+
+    @contextmanager
+    def connect(self) -> Generator[sqlite3.Connection, None, None]:
+        conn = sqlite3.connect(str(self._loc))
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _extract(xmlfile: Path) -> Tuple[Optional[Dict[Text, Text]], Dict[Text, Dict], Optional[Text]]:
+        """Coredata dict, references by id and the error message of one file.
+
+        Every part is parsed, a file whose sections fail to parse is an error as in `ScienceDirectDS.parse_errors`.
+        """
+        try:
+            parts = ScienceDirectDS.iterparse_parts(xmlfile, STREAM_PARTS)
+        except PARSE_ERRORS as e:
+            return None, {}, str(e)
+        references = parts['bibliography'].meta_dict['bibbliography-section']['references']
+        return parts['coredata'].meta_dict, references, None
+
+    @staticmethod
+    def _stat(xmlfile: Path) -> Optional[FileStat]:
+        try:
+            stat = xmlfile.stat()
+        except FileNotFoundError:
+            return None
+        return FileStat(xmlfile, stat.st_size, stat.st_mtime_ns)
+
+    def _manifest(self, conn: sqlite3.Connection, doc_names: List[Text]) -> Tuple[Dict[Text, FileStat], Dict[Text, FileStat]]:
+        """The current and the indexed file stats of `doc_names`.
+
+        Indexed documents are checked at their recorded path, the folder is only listed
+        when some of them are not indexed yet or their file is gone.
+        """
+        indexed: Dict[Text, FileStat] = {}
+        manifest: Dict[Text, FileStat] = {}
+        missing: List[Text] = []
+        for doc_name in doc_names:
+            row = conn.execute('SELECT path, size, mtime_ns FROM papers WHERE stem = ?', (doc_name,)).fetchone()
+            file_stat = None
+            if row is not None:
+                indexed[doc_name] = FileStat(Path(row[0]), row[1], row[2])
+                file_stat = self._stat(indexed[doc_name].path)
+            if file_stat is None:
+                missing.append(doc_name)
+            else:
+                manifest[doc_name] = file_stat
+
+        if missing:
+            xmlfiles = {xmlfile.stem: xmlfile for xmlfile in ScienceDirectDS.xml_files(self._path)}
+            for doc_name in missing:
+                file_stat = self._stat(xmlfiles[doc_name]) if doc_name in xmlfiles else None
+                if file_stat is not None:
+                    manifest[doc_name] = file_stat
+        return manifest, indexed
+
+    def update(self, doc_names: Optional[Iterable[Text]] = None) -> ChangeSet:
+        """Extract added and modified files and drop deleted ones.
+
+        Without `doc_names` the whole folder is rescanned, otherwise only the documents in `doc_names`
+        are checked and extracted. Files that fail to extract are kept with their error and not retried until they change.
+        """
+        with self.connect() as conn:
+            if doc_names is None:
+                manifest = {}
+                for xmlfile in ScienceDirectDS.xml_files(self._path):
+                    file_stat = self._stat(xmlfile)
+                    if file_stat is not None:
+                        manifest[xmlfile.stem] = file_stat
+                rows = conn.execute('SELECT stem, path, size, mtime_ns FROM papers')
+                indexed = {stem: FileStat(Path(path), size, mtime_ns) for stem, path, size, mtime_ns in rows}
+            else:
+                manifest, indexed = self._manifest(conn, list(OrderedDict.fromkeys(doc_names)))
+
+            added = [stem for stem in manifest if stem not in indexed]
+            modified = [stem for stem, file_stat in manifest.items() if stem in indexed and indexed[stem] != file_stat]
+            deleted = [stem for stem in indexed if stem not in manifest]
+
+            for stem in modified + deleted:
+                conn.execute('DELETE FROM papers WHERE stem = ?', (stem,))
+                conn.execute('DELETE FROM refs WHERE stem = ?', (stem,))
+
+            for stem in added + modified:
+                file_stat = manifest[stem]
+                coredata, references, error = self._extract(file_stat.path)
+                coredata = coredata or {}
+                cover_date = coredata.get('coverDate')
+                conn.execute('INSERT INTO papers VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)', (
+                    stem, str(file_stat.path), file_stat.size, file_stat.mtime_ns,
+                    coredata.get('doi'), coredata.get('title'), coredata.get('creator'),
+                    cover_date[:4] if cover_date else None, error))
+                conn.executemany('INSERT INTO refs VALUES (?, ?, ?, ?)', [
+                    (stem, position, ref_id, json.dumps(ref)) for position, (ref_id, ref) in enumerate(references.items())])
+            conn.commit()
+
+        return ChangeSet(added, modified, deleted)
+
+    @property
+    def errors(self) -> Dict[Text, Text]:
+        """Error messages of the files that failed to extract, by document name."""
+        with self.connect() as conn:
+            return dict(conn.execute('SELECT stem, error FROM papers WHERE error IS NOT NULL'))
+
+    def read(self, doc_names: Iterable[Text]) -> Dict[Text, PaperMeta]:
+        """Metadata of the indexed documents in `doc_names`, failed files are left out."""
+        result: Dict[Text, PaperMeta] = {}
+        with self.connect() as conn:
+            for doc_name in doc_names:
+                row = conn.execute('SELECT doi, title, creator, year FROM papers WHERE stem = ? AND error IS NULL', (doc_name,)).fetchone()
+                if row is None:
+                    continue
+                doi, title, creator, year = row
+
+                refs = conn.execute('SELECT ref_id, data FROM refs WHERE stem = ? ORDER BY position', (doc_name,))
+                references: Dict[Text, Dict] = {ref_id: json.loads(data) for ref_id, data in refs}
+
+                result[doc_name] = PaperMeta(doi, title, creator, year, references)
+        return result
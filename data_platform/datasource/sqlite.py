@@ -6,7 +6,7 @@ Support multiple tables (datasets)
 import json
 import sqlite3
 from contextlib import contextmanager
-from typing import Any, Dict, Generator, List, Set, Text, Tuple
+from typing import Any, Dict, Generator, Iterator, List, Set, Text, Tuple
 
 from ..config import ConfigManager
 from .abc.row import RowDataSource, RowKeyPair, RowKeyType, RowValDict
@@ -106,6 +106,35 @@ class SQLiteDS(RowDataSource):
                     result[RowKeyPair(table_name, row_key)] = parsed_json
         return result
 
+    def iter_rows(self, key: RowKeyType = RowKeyPair('@*', '@*'), batch_size: int = 64) -> Iterator[Tuple[RowKeyPair, RowValDict]]:
+        """Yield (key, row) pairs, streaming wildcard rows through a cursor `batch_size` rows at a time."""
+        table_row: List[Tuple[Text, Text]] = []
+        if isinstance(key, tuple):
+            table_row.append((key[0], key[1]))
+        elif isinstance(key, (list, dict)):
+            table_row.extend((k[0], k[1]) for k in key)
+
+        with self.connect() as conn:
+            for table_name, row_name in table_row:
+                if table_name.startswith('@*'):
+                    target_tables = list(self._tables)
+                else:
+                    if table_name not in self._tables:
+                        raise KeyError(f'No table named {table_name}')
+                    target_tables = [table_name]
+
+                for target_table in target_tables:
+                    if isinstance(row_name, str) and row_name.startswith('@*'):
+                        cursor = conn.execute(f'SELECT row_key, json FROM {target_table}')
+                    else:
+                        cursor = conn.execute(f'SELECT row_key, json FROM {target_table} WHERE row_key = ?', (row_name, ))
+
+                    rows = cursor.fetchmany(batch_size)
+                    while rows:
+                        for row_key, raw_json in rows:
+                            yield RowKeyPair(target_table, row_key), json.loads(raw_json)
+                        rows = cursor.fetchmany(batch_size)
+
     def update_row(self, key: RowKeyType, val: RowValDict) -> List[RowKeyPair]:
         result = []
         target = self._filter(key)
@@ -72,6 +72,48 @@ class Document:
         self._root.clear_sections()
 
 
+class LazyDocument(Document):
+    """Class represents one document whose element tree is built on demand.
+
+    The root is kept as its dict form until sections, paragraphs or text are
+    accessed, so metadata-only readers never allocate body elements.
+    """
+
+    def __init__(self, root_dict: tg.Dict, metadata_dict: tg.Dict[tg.Text, 'MetaData']) -> None:
+        self._root_dict: tg.Optional[tg.Dict] = root_dict
+        self._root_obj: tg.Optional[Root] = None
+        super().__init__(tg.cast(Root, None), metadata_dict)
+
+    @property
+    def _root(self) -> 'Root':
+        if self._root_obj is None:
+            self._root_obj = Root.from_dict(tg.cast(tg.Dict, self._root_dict))
+            self._root_dict = None
+            if self._id:
+                self._root_obj.document_id = self._id
+        return self._root_obj
+
+    @_root.setter
+    def _root(self, value: tg.Optional['Root']) -> None:
+        self._root_obj = value
+
+    @property
+    def is_materialized(self) -> bool:
+        return self._root_obj is not None
+
+    @property
+    def id_(self) -> tg.Text:
+        return self._id
+
+    @id_.setter
+    def id_(self, value) -> None:
+        self._id = value
+        if self._root_obj is not None:
+            self._root_obj.document_id = value
+        for meta in self._metadata.values():
+            meta.document_id = value
+
+
 class Element(ABC):
     """Abstract base class for any in-document elements."""
 
@@ -1,17 +1,36 @@
 # encoding=utf-8
+# pylint: disable=too-many-lines
 # import ssl
+import hashlib
+import os
+import pickle
+import re
+import sqlite3
+import string
+import sys
+import time
+from array import array
+from collections import Counter, OrderedDict, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import lru_cache
+from multiprocessing.util import Finalize
+from pathlib import Path
+from typing import Dict, Tuple
+import numpy as np
 import nltk
 import nltk.stem
 from nltk.tokenize import WordPunctTokenizer
-from nltk.corpus import wordnet as wn
+from nltk.corpus import conll2000, wordnet as wn
+from nltk.tag.perceptron import PerceptronTagger
 # from nltk.corpus import brown
-# from nltk.corpus import conll2000
-from rake_nltk import Rake
-from textblob import TextBlob
-from textblob import Word
+from textblob.blob import WordList
+from textblob.en.np_extractors import FastNPExtractor
+from textblob.exceptions import MissingCorpusError
 # from textblob.wordnet import VERB
 # from gensim.test.utils import common_texts, get_tmpfile
-from gensim.models import word2vec
+from gensim.models import KeyedVectors, word2vec
+from data_platform.datasource.abc.doc import DocKeyPair
 # import collections
 # ssl._create_default_https_context = ssl._create_unverified_context
 # nltk.download()
@@ -59,6 +78,55 @@ class UnigramChunker(nltk.ChunkParserI):
         return nltk.chunk.conlltags2tree(conlltags)
 
 
+# noun phrase backends: "textblob" runs TextBlob's FastNPExtractor on every sentence (it tags the sentence again),
+# "chunker" chunks the POS tags of the annotation with a UnigramChunker trained once on CoNLL-2000;
+# its agreement with textblob has not been measured on the corpus yet, run benchmark/noun_phrases.py before choosing it
+NP_BACKENDS = ("textblob", "chunker")
+# the backend of get_pipeline() when no np_backend is given
+NP_BACKEND = "textblob"
+# the trained chunker, trained and saved here on first use
+NP_CHUNKER_PATH = Path(os.getcwd()) / 'data' / 'np_chunker.pickle'
+# leading words dropped from a chunk: determiners and possessive pronouns
+NP_LEADING_TAGS = ("DT", "PDT", "WDT", "PRP$", "WP$")
+
+
+def train_np_chunker(path=NP_CHUNKER_PATH):
+    """train a UnigramChunker on the NP chunks of the CoNLL-2000 training set and save it to path"""
+    chunker = UnigramChunker(conll2000.chunked_sents("train.txt", chunk_types=["NP"]))
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with path.open('wb') as f:
+        pickle.dump(chunker, f, protocol=pickle.HIGHEST_PROTOCOL)
+    return chunker
+
+
+def load_np_chunker(path=NP_CHUNKER_PATH):
+    """the chunker saved at path, trained first if there is none"""
+    path = Path(path)
+    if not path.exists():
+        return train_np_chunker(path)
+    with path.open('rb') as f:
+        return pickle.load(f)
+
+
+def chunk_noun_phrases(chunker, tagged):
+    """the noun phrases of one tagged sentence like TextBlob's: lowercased, compound nouns of two or more words
+    and proper nouns, without leading determiners"""
+    phrases = []
+    for subtree in chunker.parse(tagged).subtrees(lambda t: t.label() == "NP"):
+        words = subtree.leaves()
+        while words and words[0][1] in NP_LEADING_TAGS:
+            words = words[1:]
+        if not any(tag.startswith("NN") for _, tag in words):
+            continue
+        if len(words) < 2 and words[0][1] not in ("NNP", "NNPS"):
+            continue
+        phrase = ' '.join(word for word, _ in words).strip().lower()
+        if len(phrase) > 1:
+            phrases.append(phrase)
+    return WordList(phrases)
+
+
 # test_sents = conll2000.chunked_sents("test.txt", chunk_types=["NP"])
 # train_sents = conll2000.chunked_sents("train.txt", chunk_types=["NP"])
 # unigram_chunker = UnigramChunker(train_sents)
@@ -86,361 +154,1209 @@ class UnigramChunker(nltk.ChunkParserI):
 # 'And now for something completely different'
 
 
-def extract_keyword(text):
-    sentences = splitSentence(text)
-    result = []
-    for sentence in sentences:
-        r = Rake()
-        r.extract_keywords_from_text(sentence)
-        result += list(r.get_word_degrees().keys())
+# 节点类型对应的词性
+NODE_TAGS = {
+    "noun": ("NN", "NNP"),
+    "adj": ("JJ",),
+    "verb": ("VB",),
+    "ner": ("NNP",),
+}
+
+
+class Annotation:
+    """
+        一篇文本的标注层，分句、分词和词性标注只做一次，节点抽取和关系抽取共用
+        tokens 是所有句子的词语，tag_ids 是对应词性在 tagset 中的编号，
+        第 i 句的词语是 tokens[bounds[i]:bounds[i+1]]，第 i 段的句子是 sentences[paragraphs[i]:paragraphs[i+1]]
+        只需要句子的节点类型（如 keyword）不分词也不标注，此时 tokens、tagset、tag_ids、bounds 为 None
+    """
+    def __init__(self, sentences, paragraphs, *, tokens=None, tagset=None, tag_ids=None, bounds=None):
+        self.sentences = sentences
+        self.tokens = tokens
+        self.tagset = tagset
+        self.tag_ids = tag_ids
+        self.bounds = bounds
+        self.paragraphs = paragraphs
+        # 按需计算的逐句结果，如关键词、名词短语
+        self.layers = {}
+
+    def __len__(self):
+        return len(self.sentences)
+
+    @property
+    def tagged(self):
+        return self.tokens is not None
+
+    def tagged_sentence(self, i):
+        """[(word, tag), ...] of the i-th sentence"""
+        start, end = self.bounds[i], self.bounds[i + 1]
+        return [(self.tokens[k], self.tagset[self.tag_ids[k]]) for k in range(start, end)]
+
+    def words_by_sentence(self, tags):
+        """the words tagged with one of tags, one list per sentence"""
+        wanted = {tag_id for tag_id, tag in enumerate(self.tagset) if tag in tags}
+        result = []
+        for i in range(len(self.sentences)):
+            start, end = self.bounds[i], self.bounds[i + 1]
+            result.append([self.tokens[k] for k in range(start, end) if self.tag_ids[k] in wanted])
+        return result
+
+    def positions_by_sentence(self, tags):
+        """the positions in their sentence (token indices) of the words of words_by_sentence(tags)"""
+        wanted = {tag_id for tag_id, tag in enumerate(self.tagset) if tag in tags}
+        result = []
+        for i in range(len(self.sentences)):
+            start, end = self.bounds[i], self.bounds[i + 1]
+            result.append([k - start for k in range(start, end) if self.tag_ids[k] in wanted])
+        return result
+
+    def by_paragraph(self, sentence_words):
+        """join per-sentence lists (such as words_by_sentence) into one list per paragraph"""
+        return [[word for words in sentence_words[self.paragraphs[i]:self.paragraphs[i + 1]] for word in words]
+                for i in range(len(self.paragraphs) - 1)]
+
+    def tagged_layer(self, name, func):
+        """func(tagged sentence) of every sentence, computed on first use"""
+        if name not in self.layers:
+            self.layers[name] = [func(self.tagged_sentence(i)) for i in range(len(self.sentences))]
+        return self.layers[name]
+
+    def layer(self, name, func):
+        """func(sentence) of every sentence, computed on first use"""
+        if name not in self.layers:
+            self.layers[name] = [func(sentence) for sentence in self.sentences]
+        return self.layers[name]
+
+
+# the annotation cache of get_pipeline() when no cache_path is given; None disables it
+ANNOTATION_CACHE_PATH = Path(os.getcwd()) / 'data' / 'annotation_cache.sqlite'
+# the cache drops the least recently used annotations beyond this many bytes
+ANNOTATION_CACHE_SIZE = 512 * 1024 * 1024
+# part of the cache key, changed whenever the cached fields of Annotation change
+ANNOTATION_CACHE_VERSION = 2
+# the cache writes its puts and uses to disk in one transaction every this many operations
+ANNOTATION_CACHE_BATCH = 64
+
+
+class AnnotationCache:
+    """
+        标注结果的磁盘缓存（sqlite），键是文本内容的 sha1，
+        不同的节点类型、不同的运行之间共用；总大小超过 max_size 时删除最久未使用的条目
+        put 和 get 先记在内存里，每 batch_size 次操作（以及 flush()、进程退出时）在一个事务中写入；
+        总大小和条目数记在 meta 表中，不需要扫描整个表
+        每个进程使用自己的连接，所以可以在多个进程中使用
+    """
+    # the layout of the tables, they are created again when it changes
+    SCHEMA_VERSION = 1
+
+    def __init__(self, path, max_size=ANNOTATION_CACHE_SIZE, language='english', batch_size=ANNOTATION_CACHE_BATCH):
+        self.path = Path(path)
+        self.max_size = max_size
+        self.language = language
+        self.batch_size = batch_size
+        self.hits = 0
+        self.misses = 0
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._conn = None
+        self._pid = None
+        # the Finalize that flushes at the exit of the process of the connection
+        self._finalizer = None
+        # key -> (pickled annotation, last used) not written yet, and key -> last used of the cached keys read since
+        self._pending = {}
+        self._used = {}
+        self._operations = 0
+        with self.transaction() as conn:
+            if conn.execute("PRAGMA user_version").fetchone()[0] != self.SCHEMA_VERSION:
+                conn.execute("DROP TABLE IF EXISTS annotations")
+                conn.execute("DROP TABLE IF EXISTS meta")
+                conn.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+            # size comes before data so that reading it does not touch the overflow pages of the blob
+            conn.execute("CREATE TABLE IF NOT EXISTS annotations(key TEXT PRIMARY KEY, size INTEGER, last_used REAL, data BLOB)")
+            conn.execute("CREATE INDEX IF NOT EXISTS annotations_last_used ON annotations(last_used)")
+            conn.execute("CREATE TABLE IF NOT EXISTS meta(name TEXT PRIMARY KEY, value INTEGER)")
+            conn.execute("INSERT OR IGNORE INTO meta VALUES ('entries', 0), ('size', 0)")
+
+    def connection(self):
+        """the connection of this process; a forked child drops the connection and the buffers of its parent"""
+        if self._pid != os.getpid():
+            self._conn = sqlite3.connect(str(self.path), timeout=60, isolation_level=None)
+            self._pid = os.getpid()
+            self._pending.clear()
+            self._used.clear()
+            self._operations = 0
+            # the workers of a pool exit without atexit handlers, but they run the finalizers registered in them;
+            # one finalizer per process, the one copied from the parent is dropped
+            if self._finalizer is not None:
+                self._finalizer.cancel()
+            self._finalizer = Finalize(self, self.flush, exitpriority=10)
+        return self._conn
+
+    @contextmanager
+    def transaction(self):
+        # BEGIN IMMEDIATE takes the write lock first, so the totals read inside stay right with other processes writing
+        conn = self.connection()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    def key(self, text):
+        return hashlib.sha1((str(ANNOTATION_CACHE_VERSION) + '\0' + self.language + '\0' + text).encode('utf-8')).hexdigest()
+
+    def get(self, text):
+        """the cached Annotation of text, None if it is not cached"""
+        conn = self.connection()
+        key = self.key(text)
+        if key in self._pending:
+            data = self._pending[key][0]
+        else:
+            row = conn.execute("SELECT data FROM annotations WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            data = row[0]
+            self._used[key] = time.time()
+            self._count()
+        self.hits += 1
+        sentences, tokens, tagset, tag_ids, bounds, paragraphs = pickle.loads(data)
+        return Annotation(sentences, paragraphs, tokens=tokens, tagset=tagset, tag_ids=tag_ids, bounds=bounds)
+
+    def put(self, text, annotation):
+        """cache the tokens and tags of annotation (layers such as keywords are not kept)"""
+        self.connection()
+        data = pickle.dumps((annotation.sentences, annotation.tokens, annotation.tagset, annotation.tag_ids, annotation.bounds,
+                             annotation.paragraphs), protocol=pickle.HIGHEST_PROTOCOL)
+        self._pending[self.key(text)] = (data, time.time())
+        self._count()
+
+    def _count(self):
+        self._operations += 1
+        if self._operations >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """write the buffered puts and uses, then evict beyond max_size"""
+        self._operations = 0
+        if self._pid != os.getpid() or not (self._pending or self._used):
+            return
+        with self.transaction() as conn:
+            entries = size = 0
+            for key, (data, last_used) in self._pending.items():
+                row = conn.execute("SELECT size FROM annotations WHERE key = ?", (key,)).fetchone()
+                entries += row is None
+                size += len(data) - (row[0] if row else 0)
+                conn.execute("INSERT OR REPLACE INTO annotations VALUES (?, ?, ?, ?)", (key, len(data), last_used, data))
+            conn.executemany("UPDATE annotations SET last_used = ? WHERE key = ?",
+                             ((last_used, key) for key, last_used in self._used.items() if key not in self._pending))
+            self._add_totals(conn, entries, size)
+            self._evict(conn)
+        self._pending.clear()
+        self._used.clear()
+
+    def close(self):
+        """flush, then close the connection of this process"""
+        self.flush()
+        if self._pid == os.getpid():
+            self._conn.close()
+        if self._finalizer is not None:
+            self._finalizer.cancel()
+            self._finalizer = None
+        self._conn = None
+        self._pid = None
+
+    def _add_totals(self, conn, entries, size):
+        conn.execute("UPDATE meta SET value = value + ? WHERE name = 'entries'", (entries,))
+        conn.execute("UPDATE meta SET value = value + ? WHERE name = 'size'", (size,))
+
+    def _totals(self, conn):
+        totals = dict(conn.execute("SELECT name, value FROM meta"))
+        return totals['entries'], totals['size']
+
+    def _evict(self, conn):
+        # 每次删除估计的条数（超出的大小 / 平均大小）个最久未使用的条目，直到不超过 max_size
+        entries, size = self._totals(conn)
+        while size > self.max_size and entries > 0:
+            count = max(1, (size - self.max_size) * entries // size)
+            oldest = "SELECT key FROM annotations ORDER BY last_used LIMIT ?"
+            evicted, evicted_size = conn.execute(f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM annotations WHERE key IN ({oldest})",
+                                                 (count,)).fetchone()
+            if not evicted:
+                break
+            conn.execute(f"DELETE FROM annotations WHERE key IN ({oldest})", (count,))
+            self._add_totals(conn, -evicted, -evicted_size)
+            entries, size = entries - evicted, size - evicted_size
+
+    def stats(self):
+        """hits and misses of this process, and the entries and bytes on disk"""
+        self.flush()
+        entries, size = self._totals(self.connection())
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'size': size}
+
+    def clear(self):
+        self.connection()
+        self._pending.clear()
+        self._used.clear()
+        with self.transaction() as conn:
+            conn.execute("DELETE FROM annotations")
+            conn.execute("UPDATE meta SET value = 0")
+        self.hits = 0
+        self.misses = 0
+
+
+# co-occurrence scopes: words of one sentence, words at most CO_WINDOW - 1 tokens apart in a sentence, words of one paragraph
+CO_SCOPES = ("sentence", "window", "paragraph")
+# the co_scope and co_window of get_pipeline() when none is given
+CO_SCOPE = "sentence"
+CO_WINDOW = 5
+
+
+class Vocabulary:
+    """
+        网络构建的词表驻留：每个不同的词语按第一次出现的顺序映射为从 0 开始的整数编号，
+        共现计数和各文档结果的合并都在编号上进行，写入图时再换回 "word_" 节点键，可读的词语保存在节点的 word 和 name 属性中
+        每次构建使用自己的词表，构建结束后即被释放
+    """
+    def __init__(self):
+        # word -> id, and id -> word
+        self.index = {}
+        self.words = []
+
+    def __len__(self):
+        return len(self.words)
+
+    def add(self, word):
+        """the id of word, a new one if it is not in the vocabulary yet"""
+        word_id = self.index.get(word)
+        if word_id is None:
+            word_id = self.index[word] = len(self.words)
+            self.words.append(word)
+        return word_id
+
+    def ids(self, words):
+        return [self.add(word) for word in words]
+
+    def node_key(self, word_id):
+        return "word_" + self.words[word_id]
+
+
+class CoOccurrence:
+    """
+        共现关系引擎：在 scope 范围内两两出现的词语计数，
+        结果是 {(id1, id2): count} 的 Counter，词语先经 Vocabulary 驻留为整数编号，每对词语按第一次出现的顺序只保存一次，
+        内存与不同词对的数目成正比，而不是与出现次数成正比
+        window 按词语在句子中的位置计算（NLPPipeline.sentence_positions）：按词性选出的节点是分词结果的下标，
+        所以被过滤掉的词也占位置；keyword 和 noun_phrase 不是单个词，位置是它们在句子的节点中的序号
+    """
+    def __init__(self, scope=CO_SCOPE, window=CO_WINDOW):
+        if scope not in CO_SCOPES:
+            raise ValueError(f'Unknown co-occurrence scope: {scope}')
+        self.scope = scope
+        self.window = window
+
+    def pairs(self, annotation, sentence_words, sentence_positions=None):
+        """yield (word1, word2) for every co-occurrence in sentence_words, the node words of every sentence of annotation.
+        within a sentence or paragraph each pair is yielded once, word1 first seen before word2;
+        within a window every two different words less than window positions apart are a co-occurrence,
+        the positions are sentence_positions (the indices in sentence_words if None)"""
+        if self.scope == "window":
+            if sentence_positions is None:
+                sentence_positions = [range(len(words)) for words in sentence_words]
+            for words, positions in zip(sentence_words, sentence_positions):
+                for i, word1 in enumerate(words):
+                    for j in range(i + 1, len(words)):
+                        if positions[j] - positions[i] >= self.window:
+                            break
+                        if word1 != words[j]:
+                            yield word1, words[j]
+            return
+
+        units = annotation.by_paragraph(sentence_words) if self.scope == "paragraph" else sentence_words
+        for words in units:
+            distinct = list(OrderedDict.fromkeys(words))
+            for i in range(0, len(distinct)-1):
+                word1 = distinct[i]
+                for word2 in distinct[i+1:]:
+                    yield word1, word2
+
+    def count(self, annotation, sentence_words, vocabulary, *, counts=None, sentence_positions=None):
+        """add the co-occurrences to counts (a new Counter if None) and return it, keyed by the ids of the words in vocabulary;
+        a pair seen before in the other order is counted on the existing entry"""
+        if counts is None:
+            counts = Counter()
+        sentence_ids = [vocabulary.ids(words) for words in sentence_words]
+        for id1, id2 in self.pairs(annotation, sentence_ids, sentence_positions):
+            pair = (id1, id2)
+            if pair not in counts and (id2, id1) in counts:
+                pair = (id2, id1)
+            counts[pair] += 1
+        return counts
+
+
+# wordnet pairs below this similarity are dropped (0 keeps every pair with a similarity, as before);
+# the wordnet_threshold of get_pipeline() when none is given
+WORDNET_THRESHOLD = 0
+# keep only the top_k most similar pairs of every word, None keeps all of them; the wordnet_top_k of get_pipeline() when none is given
+WORDNET_TOP_K = None
+# words whose synset and synset pairs whose similarity are kept
+WORDNET_CACHE_SIZE = 1 << 18
+
+
+class WordNetSimilarity:
+    """
+        wordnet 相似度引擎：每个词的第一个 synset 和每对 synset 的相似度都保存在有界的 LRU 缓存中，
+        对整个文档的词表一次性计算两两相似度；低于 threshold 的词对被丢弃，
+        top_k 不为 None 时每个词只保留相似度最高的 top_k 个词对
+    """
+    def __init__(self, stem, threshold=WORDNET_THRESHOLD, top_k=WORDNET_TOP_K, cache_size=WORDNET_CACHE_SIZE):
+        self.stem = stem
+        self.threshold = threshold
+        self.top_k = top_k
+        self.synset = lru_cache(maxsize=cache_size)(self._synset)
+        self._synset_similarity = lru_cache(maxsize=cache_size)(self._path_similarity)
+
+    def _synset(self, word):
+        """the first synset of the stem of word, None if it has none"""
+        synsets = wn.synsets(self.stem(word))
+        return synsets[0] if synsets else None
+
+    @staticmethod
+    def _path_similarity(synset1, synset2):
+        return synset1.path_similarity(synset2)
+
+    def similarity(self, word1, word2):
+        """path similarity of the first synsets of the word stems, 0 if either word has no synset"""
+        synset1 = self.synset(word1)
+        synset2 = self.synset(word2)
+        if synset1 is None or synset2 is None:
+            return 0
+        return self._synset_similarity(synset1, synset2)
+
+    def relations(self, words):
+        """[(word1, word2, similarity)] between the distinct words, word1 first seen before word2"""
+        vocabulary = [word for word in OrderedDict.fromkeys(words) if self.synset(word) is not None]
+        synsets = [self.synset(word) for word in vocabulary]
+        pairs = []
+        for i in range(0, len(vocabulary)-1):
+            for j in range(i+1, len(vocabulary)):
+                similarity = self._synset_similarity(synsets[i], synsets[j])
+                if similarity and similarity >= self.threshold:
+                    pairs.append((vocabulary[i], vocabulary[j], similarity))
+        if self.top_k is not None:
+            pairs = self._top_k(pairs)
+        return pairs
+
+    def _top_k(self, pairs):
+        """keep the pairs among the top_k most similar of either word, in their original order"""
+        ranked = defaultdict(list)
+        for index, (word1, word2, similarity) in enumerate(pairs):
+            ranked[word1].append((-similarity, index))
+            ranked[word2].append((-similarity, index))
+        kept = set()
+        for candidates in ranked.values():
+            kept.update(index for _, index in sorted(candidates)[:self.top_k])
+        return [pair for index, pair in enumerate(pairs) if index in kept]
+
+
+# the word2vec model saved by word2vec_initialize
+WORD2VEC_MODEL = "knowledgeB.model"
+# the vectors of a model are also saved to its path + this suffix, to be opened with mmap
+WORD2VEC_VECTORS_SUFFIX = ".kv"
+
+
+class Word2VecRegistry:
+    """
+        word2vec 模型注册表，每个模型只从磁盘加载一次，模型文件被修改（train_more 或其他进程保存）后重新加载；
+        查询只需要词向量，词向量单独保存并以 mmap 只读打开，多个工作进程共享同一份内存
+    """
+    def __init__(self):
+        # path -> (mtime of the model file, Word2Vec), for training
+        self._models = {}
+        # path -> (mtime of the model file, KeyedVectors), for lookups
+        self._vectors = {}
+
+    def model(self, path=WORD2VEC_MODEL):
+        """the full model saved at path"""
+        path = str(path)
+        mtime = os.path.getmtime(path)
+        if self._models.get(path, (None,))[0] != mtime:
+            self._models[path] = (mtime, word2vec.Word2Vec.load(path))
+        return self._models[path][1]
+
+    def vectors(self, path=WORD2VEC_MODEL):
+        """the read-only, memory mapped KeyedVectors of the model saved at path"""
+        path = str(path)
+        mtime = os.path.getmtime(path)
+        if self._vectors.get(path, (None,))[0] != mtime:
+            vectors_path = path + WORD2VEC_VECTORS_SUFFIX
+            if not os.path.exists(vectors_path) or os.path.getmtime(vectors_path) < mtime:
+                self.model(path).wv.save(vectors_path, sep_limit=0)
+            self._vectors[path] = (mtime, KeyedVectors.load(vectors_path, mmap='r'))
+        return self._vectors[path][1]
+
+    def save(self, model, path=WORD2VEC_MODEL):
+        """save model and its vectors to path and register it"""
+        path = str(path)
+        model.save(path)
+        model.wv.save(path + WORD2VEC_VECTORS_SUFFIX, sep_limit=0)
+        self._models[path] = (os.path.getmtime(path), model)
+        self._vectors.pop(path, None)
+
+    def initialize(self, sentences, path=WORD2VEC_MODEL, **params):
+        """train a new model on sentences (lists of words) and save it to path"""
+        params = dict({'vector_size': 100, 'window': 5, 'min_count': 1, 'workers': 4}, **params)
+        model = word2vec.Word2Vec(sentences, **params)
+        self.save(model, path)
+        return model
+
+    def train_more(self, sentences, path=WORD2VEC_MODEL):
+        """add the new words of sentences to the vocabulary of the model at path, train it on sentences and save it"""
+        model = self.model(path)
+        model.build_vocab(sentences, update=True)
+        # build_vocab counted the sentences, so sentences may be any restartable iterable such as CorpusSentences
+        model.train(sentences, total_examples=model.corpus_count, epochs=model.epochs)
+        self.save(model, path)
+        return model
+
+    def lookup(self, words, path=WORD2VEC_MODEL):
+        """the vectors of words as one matrix, one row per word; words out of the vocabulary get a zero row"""
+        vectors = self.vectors(path)
+        matrix = np.zeros((len(words), vectors.vector_size), dtype=vectors.vectors.dtype)
+        rows = [i for i, word in enumerate(words) if word in vectors]
+        if rows:
+            matrix[rows] = vectors[[words[i] for i in rows]]
+        return matrix
+
+
+class CorpusSentences:
+    """
+        word2vec 的训练语料：逐篇读取 DocDataSource 中的文档，逐句产生分词结果（同 para2senc2words），
+        每次 iter 都从头开始，所以 gensim 可以多次遍历；workers > 1 时多个进程同时分词；
+        给出 cache_path 时第一次完整遍历的结果写入该文件（每行一句，词语以空格分隔），之后直接读取该文件
+    """
+    def __init__(self, datasource, key=DocKeyPair('@*', '@*'), workers=1, cache_path=None, batch_size=64):
+        self.datasource = datasource
+        self.key = key
+        self.workers = workers
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.batch_size = batch_size
+
+    def __iter__(self):
+        if self.cache_path is not None and self.cache_path.exists():
+            yield from word2vec.LineSentence(str(self.cache_path))
+            return
+        if self.cache_path is None:
+            yield from self._tokenize()
+            return
+
+        # written under a temporary name, an interrupted pass leaves no partial cache
+        partial = self.cache_path.with_name(self.cache_path.name + '.partial')
+        with partial.open('w', encoding='utf-8') as f:
+            for words in self._tokenize():
+                f.write(' '.join(words) + '\n')
+                yield words
+        os.replace(str(partial), str(self.cache_path))
+
+    def _texts(self):
+        for _, doc in self.datasource.iter_docset(self.key, self.batch_size):
+            yield doc.get_text()
+
+    def _tokenize(self):
+        if self.workers <= 1:
+            for text in self._texts():
+                yield from (words for words in para2senc2words(text) if words)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.workers) as executor:
+            batch = []
+            for text in self._texts():
+                batch.append(text)
+                # Executor.map submits everything at once, so the documents are handed over batch by batch
+                if len(batch) >= self.batch_size:
+                    yield from self._tokenize_batch(executor, batch)
+                    batch = []
+            yield from self._tokenize_batch(executor, batch)
+
+    @staticmethod
+    def _tokenize_batch(executor, texts):
+        for sentences in executor.map(para2senc2words, texts):
+            yield from (words for words in sentences if words)
+
+
+# every word of the embedding relation is linked to its top_k nearest words; the embedding_top_k of get_pipeline() when none is given
+EMBEDDING_TOP_K = 10
+# rows of the similarity matrix computed at once, bounds the memory to block_size * vocabulary size floats;
+# the embedding_block_size of get_pipeline() when none is given
+EMBEDDING_BLOCK_SIZE = 1024
+
+
+def embedding_neighbours(words, vectors, top_k=EMBEDDING_TOP_K, block_size=EMBEDDING_BLOCK_SIZE):
+    """[(word1, word2, cosine similarity)] linking every distinct word found in vectors (gensim KeyedVectors)
+    to its top_k nearest words with a positive similarity; words are taken in first-seen order,
+    the neighbours of a word by decreasing similarity, and a pair found from both words is kept once"""
+    vocabulary = [word for word in OrderedDict.fromkeys(words) if word in vectors]
+    if len(vocabulary) < 2 or top_k <= 0:
+        return []
+    matrix = np.asarray(vectors[vocabulary], dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    matrix /= np.where(norms > 0, norms, 1)
+    k = min(top_k, len(vocabulary) - 1)
+
+    relation = []
+    seen = set()
+    for start in range(0, len(vocabulary), block_size):
+        similarity = matrix[start:start + block_size] @ matrix.T
+        rows = np.arange(similarity.shape[0])
+        similarity[rows, rows + start] = -np.inf
+        nearest = np.argpartition(-similarity, k - 1, axis=1)[:, :k]
+        for row, columns in enumerate(nearest):
+            i = start + row
+            for j in columns[np.argsort(-similarity[row, columns], kind='stable')]:
+                value = float(similarity[row, j])
+                pair = (i, j) if i < j else (j, i)
+                if value > 0 and pair not in seen:
+                    seen.add(pair)
+                    relation.append((vocabulary[i], vocabulary[j], value))
+    return relation
+
+
+class KeywordExtractor:
+    """
+        关键词抽取器，结果与 rake_nltk 的 Rake().get_word_degrees() 的键相同：
+        去掉停用词和标点后剩下的小写词语，按第一次出现的顺序；
+        停用词集合和分词正则只构造一次，不计算 Rake 的共现图和排序，可以一次处理多个句子或文档
+    """
+    # the pattern of nltk.tokenize.wordpunct_tokenize, which Rake uses
+    WORD_PUNCT = re.compile(r'\w+|[^\w\s]+')
+
+    def __init__(self, language='english', stopwords=None):
+        # the phrase delimiters of Rake: stopwords (the nltk list of language if None) and single punctuation characters
+        if stopwords is None:
+            stopwords = nltk.corpus.stopwords.words(language)
+        self.ignore = frozenset(stopwords) | frozenset(string.punctuation)
+
+    def keywords(self, text):
+        ignore = self.ignore
+        return list(OrderedDict.fromkeys(word for word in map(str.lower, self.WORD_PUNCT.findall(text)) if word not in ignore))
+
+    def keywords_many(self, texts):
+        """the keywords of each text"""
+        return [self.keywords(text) for text in texts]
+
+
+# term normalization steps, applied in this order
+NORMALIZE_STEPS = ("lowercase", "stopwords", "lemmatize", "stem")
+# the steps of get_pipeline() when no normalize is given, () keeps the words as they are
+NORMALIZE = ()
+# surface forms whose normalized form is kept
+NORMALIZE_CACHE_SIZE = 1 << 16
+
+
+class TermNormalizer:
+    """
+        词语规范化（小写、去停用词、词形还原、词干提取），在生成节点和关系之前进行，
+        这样 "shops" 和 "shop" 是同一个节点；短语逐词处理，每个原始词形的结果保存在有界的 LRU 缓存中
+    """
+    def __init__(self, steps, stem=None, lemmatize=None, stopwords=(), cache_size=NORMALIZE_CACHE_SIZE):
+        unknown = set(steps).difference(NORMALIZE_STEPS)
+        if unknown:
+            raise ValueError(f'Unknown normalization steps: {sorted(unknown)}')
+        self.steps = tuple(step for step in NORMALIZE_STEPS if step in steps)
+        self.stem = stem
+        self.lemmatize = lemmatize
+        self.stopwords = frozenset(stopwords)
+        self.normalize = lru_cache(maxsize=cache_size)(self._normalize)
+
+    def _normalize(self, term):
+        """the normalized form of term, None if it is dropped"""
+        term = str(term)
+        if "lowercase" in self.steps:
+            term = term.lower()
+        if "stopwords" in self.steps and term.lower() in self.stopwords:
+            return None
+        parts = term.split(' ')
+        if "lemmatize" in self.steps:
+            parts = [self.lemmatize(part) for part in parts]
+        if "stem" in self.steps:
+            parts = [self.stem(part) for part in parts]
+        return ' '.join(parts) or None
+
+    def __call__(self, words):
+        """the normalized words, without the dropped ones"""
+        normalize = self.normalize
+        return [term for term in map(normalize, words) if term is not None]
+
+
+class NLPPipeline:  # pylint: disable=too-many-public-methods
+    """
+        自然语言处理流水线，
+        分句器、分词器、词性标注器、词干提取器、词形还原器、关键词抽取器和名词短语抽取器只加载一次，
+        所有 extract_* 函数都是它的方法；模块级的同名函数使用默认流水线 get_pipeline()
+        选项的默认值是模块常量，get_pipeline() 在每次调用时读取它们
+    """
+    def __init__(self, language='english', cache=None, *, normalize=NORMALIZE, np_backend=NP_BACKEND, co_scope=CO_SCOPE, co_window=CO_WINDOW,
+                 wordnet_threshold=WORDNET_THRESHOLD, wordnet_top_k=WORDNET_TOP_K, embedding_top_k=EMBEDDING_TOP_K,
+                 embedding_block_size=EMBEDDING_BLOCK_SIZE):
+        if np_backend not in NP_BACKENDS:
+            raise ValueError(f'Unknown noun phrase backend: {np_backend}')
+        if co_scope not in CO_SCOPES:
+            raise ValueError(f'Unknown co-occurrence scope: {co_scope}')
+        self.np_backend = np_backend
+        # the scope and window of CoOccurrence
+        self.co_scope = co_scope
+        self.co_window = co_window
+        # the threshold and top_k of WordNetSimilarity
+        self.wordnet_threshold = wordnet_threshold
+        self.wordnet_top_k = wordnet_top_k
+        # the top_k and block_size of embedding_neighbours
+        self.embedding_top_k = embedding_top_k
+        self.embedding_block_size = embedding_block_size
+        self.language = language
+        # AnnotationCache of the annotations, None to annotate every text again
+        self.cache = cache
+        # the NORMALIZE_STEPS applied to the node words
+        self.normalize = tuple(normalize)
+        self._normalizer = None
+        self._sentence_tokenizer = None
+        self._word_punct_tokenizer = None
+        self._tagger = None
+        self._stemmer = None
+        self._lemmatizer = None
+        self._keyword_extractor = None
+        self._np_extractor = None
+        self._np_chunker = None
+        self._co_occurrence = None
+        self._wordnet = None
+
+    # 各组件在第一次使用时加载
+    @property
+    def sentence_tokenizer(self):
+        if self._sentence_tokenizer is None:
+            self._sentence_tokenizer = nltk.data.load('tokenizers/punkt/' + self.language + '.pickle')
+        return self._sentence_tokenizer
+
+    @property
+    def word_punct_tokenizer(self):
+        if self._word_punct_tokenizer is None:
+            self._word_punct_tokenizer = WordPunctTokenizer()
+        return self._word_punct_tokenizer
+
+    @property
+    def tagger(self):
+        if self._tagger is None:
+            self._tagger = PerceptronTagger()
+        return self._tagger
+
+    @property
+    def stemmer(self):
+        if self._stemmer is None:
+            self._stemmer = nltk.stem.SnowballStemmer(self.language)
+        return self._stemmer
+
+    @property
+    def lemmatizer(self):
+        if self._lemmatizer is None:
+            self._lemmatizer = nltk.stem.WordNetLemmatizer()
+        return self._lemmatizer
+
+    @property
+    def keyword_extractor(self):
+        if self._keyword_extractor is None:
+            self._keyword_extractor = KeywordExtractor(self.language)
+        return self._keyword_extractor
+
+    @property
+    def np_extractor(self):
+        if self._np_extractor is None:
+            self._np_extractor = FastNPExtractor()
+        return self._np_extractor
+
+    @property
+    def np_chunker(self):
+        if self._np_chunker is None:
+            self._np_chunker = load_np_chunker(NP_CHUNKER_PATH)
+        return self._np_chunker
+
+    @property
+    def normalizer(self):
+        # None when the node words are kept as they are
+        if self._normalizer is None and self.normalize:
+            stopwords = nltk.corpus.stopwords.words(self.language) if "stopwords" in self.normalize else ()
+            self._normalizer = TermNormalizer(self.normalize, self.word_stem, self.word_lemmatized, stopwords)
+        return self._normalizer
+
+    @property
+    def co_occurrence(self):
+        if self._co_occurrence is None:
+            self._co_occurrence = CoOccurrence(self.co_scope, self.co_window)
+        return self._co_occurrence
+
+    @property
+    def wordnet(self):
+        # stems, synsets and similarities are kept for the lifetime of the pipeline
+        if self._wordnet is None:
+            self._wordnet = WordNetSimilarity(self.word_stem, self.wordnet_threshold, self.wordnet_top_k)
+        return self._wordnet
+
+    @property
+    def word_vectors(self):
+        # the vectors of the word2vec model, read through the registry so that a retrained model is picked up
+        return get_registry().vectors(WORD2VEC_MODEL)
+
+    def warm_up(self):
+        """load every component and run it once, so the first real request does not pay the loading cost.
+        a component whose nltk data is missing is skipped with a warning, and only fails when it is used"""
+        sentence = 'The quick brown fox jumps over the lazy dog.'
+        steps = [
+            ("sentence tokenizer", lambda: self.split_sentence(sentence)),
+            ("word tokenizer", lambda: self.word_tokenize(sentence)),
+            ("POS tagger", lambda: self.pos_tag(self.word_punct_tokenize(sentence))),
+            ("keyword extractor", lambda: self.keywords(sentence)),
+            ("noun phrase extractor", lambda: self.noun_phrases(sentence)),
+            ("lemmatizer", lambda: self.word_lemmatized('dogs')),
+            ("wordnet similarity", lambda: self.wordnet_similarity('fox', 'dog')),
+        ]
+        for name, step in steps:
+            try:
+                step()
+            except (LookupError, MissingCorpusError):
+                print(f"Warning: the {name} is not loaded, its nltk data is missing.", file=sys.stderr)
+        return self
+
+    # 基本操作
+    def split_sentence(self, paragraph):
+        return self.sentence_tokenizer.tokenize(paragraph)
+
+    def word_tokenize(self, text):
+        return nltk.word_tokenize(text, self.language)
+
+    def word_punct_tokenize(self, sentence):
+        return self.word_punct_tokenizer.tokenize(sentence)
+
+    def pos_tag(self, words):
+        return self.tagger.tag(words)
+
+    def pos_tag_sents(self, sentences):
+        return self.tagger.tag_sents(sentences)
+
+    def keywords(self, text):
+        return self.keyword_extractor.keywords(text)
+
+    def noun_phrases(self, text):
+        if self.np_backend == "chunker":
+            return self.chunk_noun_phrases(self.pos_tag(self.word_tokenize(text)))
+        # same as TextBlob(text).noun_phrases
+        return WordList([phrase.strip().lower() for phrase in self.np_extractor.extract(text) if len(phrase) > 1])
+
+    def chunk_noun_phrases(self, tagged):
+        return chunk_noun_phrases(self.np_chunker, tagged)
+
+    # 词干提取 fishing-fish shops-shop
+    def word_stem(self, word):
+        stem = self.stemmer.stem(word)
+        if stem:
+            return stem
+        return word
+
+    # 词形还原 octopi-octopus
+    def word_lemmatized(self, word):
+        return self.lemmatizer.lemmatize(word, wn.NOUN)
+
+    def para2senc2words(self, text):
+        return [self.word_punct_tokenize(sentence) for sentence in self.split_sentence(text)]
+
+    def needs_tags(self, node):
+        """whether the words of a node type are read from the POS tags"""
+        return node in NODE_TAGS or (node == "noun_phrase" and self.np_backend == "chunker")
+
+    def annotate(self, text, node=None):
+        """split, tokenize and tag text once, return its Annotation, see iter_annotations"""
+        return next(self.iter_annotations([text], node))
+
+    def iter_annotations(self, texts, node=None):
+        """annotate texts in order, texts found in the annotation cache are not annotated again.
+        when node is given and its words do not need the POS tags (keyword, the textblob noun_phrase),
+        the sentences are only split, not tokenized and tagged"""
+        tag = node is None or self.needs_tags(node)
+        for text in texts:
+            annotation = self.cache.get(text) if self.cache is not None else None
+            if annotation is None or (tag and not annotation.tagged):
+                sentences = self.split_sentence(text)
+                paragraphs = self._paragraph_bounds(text, sentences)
+                if tag:
+                    tagged = self.pos_tag_sents([self.word_tokenize(sentence) for sentence in sentences])
+                    annotation = self._make_annotation(sentences, tagged, paragraphs)
+                else:
+                    annotation = Annotation(sentences, paragraphs)
+                if self.cache is not None:
+                    self.cache.put(text, annotation)
+            yield annotation
+
+    @staticmethod
+    def _paragraph_bounds(text, sentences):
+        """indexes of the sentences starting a paragraph, a paragraph starts after a line break, ending with len(sentences)"""
+        paragraphs = array('L', [0])
+        end = 0
+        for i, sentence in enumerate(sentences):
+            start = text.find(sentence, end)
+            if start < 0:
+                continue
+            if i > 0 and '\n' in text[end:start]:
+                paragraphs.append(i)
+            end = start + len(sentence)
+        paragraphs.append(len(sentences))
+        return paragraphs
+
+    @staticmethod
+    def _make_annotation(sentences, tagged, paragraphs):
+        tokens = []
+        tagset = []
+        tag_index = {}
+        tag_ids = array('H')
+        bounds = array('L', [0])
+        for word_tag in tagged:
+            for word, tag in word_tag:
+                if tag not in tag_index:
+                    tag_index[tag] = len(tagset)
+                    tagset.append(tag)
+                tokens.append(word)
+                tag_ids.append(tag_index[tag])
+            bounds.append(len(tokens))
+        return Annotation(sentences, paragraphs, tokens=tokens, tagset=tagset, tag_ids=tag_ids, bounds=bounds)
+
+    def sentence_words(self, annotation, node):
+        """the words of a node type ("noun"/"adj"/"verb"/"ner"/"keyword"/"noun_phrase") in every sentence,
+        normalized by the normalizer before they become nodes and relations"""
+        sentence_words = self._sentence_words(annotation, node)
+        if self.normalizer is None:
+            return sentence_words
+        return [self.normalizer(words) for words in sentence_words]
+
+    def sentence_positions(self, annotation, node):
+        """the positions in their sentence of the words of sentence_words(annotation, node): token indices for the
+        node types chosen by tags, the index among the sentence's terms for keyword and noun_phrase"""
+        sentence_words = self._sentence_words(annotation, node)
+        if node in NODE_TAGS:
+            sentence_positions = annotation.positions_by_sentence(NODE_TAGS[node])
+        else:
+            sentence_positions = [range(len(words)) for words in sentence_words]
+        if self.normalizer is None:
+            return [list(positions) for positions in sentence_positions]
+        normalize = self.normalizer.normalize
+        return [[position for position, word in zip(positions, words) if normalize(word) is not None]
+                for positions, words in zip(sentence_positions, sentence_words)]
+
+    def _sentence_words(self, annotation, node):
+        """sentence_words before normalization"""
+        if self.needs_tags(node) and not annotation.tagged:
+            raise ValueError(f'The {node} words need a tagged annotation')
+        if node in NODE_TAGS:
+            return annotation.words_by_sentence(NODE_TAGS[node])
+        if node == "keyword":
+            return annotation.layer(node, self.keywords)
+        if node == "noun_phrase" and self.np_backend == "chunker":
+            # the chunker works on the tags of the annotation, the sentences are not tagged again
+            return annotation.tagged_layer("noun_phrase_chunker", self.chunk_noun_phrases)
+        if node == "noun_phrase":
+            return annotation.layer(node, self.noun_phrases)
+        return []
+
+    def extract_nodes(self, annotation, node):
+        result = []
+        for words in self.sentence_words(annotation, node):
+            result += words
+        return result
+
+    def extract_keyword(self, text):
+        return self.extract_nodes(self.annotate(text, "keyword"), "keyword")
+
+    def extract_keyword2(self, text):
+        return self.keywords(text)
+
+    def extract_word(self, text):
+        return self.word_tokenize(text)
+
+    def extract_word_freq(self, text):
+        return nltk.FreqDist(self.word_tokenize(text))
+
+    def extract_noun(self, text):
+        return self.extract_nodes(self.annotate(text, "noun"), "noun")
+
+    def extract_noun2(self, text):
+        return self._extract_tags(text, NODE_TAGS["noun"])
+
+    def extract_adj(self, text):
+        return self.extract_nodes(self.annotate(text, "adj"), "adj")
+
+    def extract_adj2(self, text):
+        return self._extract_tags(text, NODE_TAGS["adj"])
+
+    def extract_verb(self, text):
+        return self.extract_nodes(self.annotate(text, "verb"), "verb")
+
+    def extract_verb2(self, text):
+        return self._extract_tags(text, NODE_TAGS["verb"])
+
+    def extract_ner(self, text):
+        # tokens = nltk.word_tokenize('I am very excited about the next generation of Apple products.')
+        # tokens = nltk.pos_tag(tokens)
+        # tree = nltk.ne_chunk(tokens)
+        # print(tree)
+        return self.extract_nodes(self.annotate(text, "ner"), "ner")
+
+    def extract_ner2(self, text):
+        return self._extract_tags(text, NODE_TAGS["ner"])
+
+    def extract_noun_phrase(self, text):
+        return self.extract_nodes(self.annotate(text, "noun_phrase"), "noun_phrase")
+
+    def extract_noun_phrase2(self, text):
+        return self.noun_phrases(text)
+
+    # 把整段文本当作一句来标注
+    def _extract_tags(self, text, tags):
+        word_tag = self.pos_tag(self.word_tokenize(text))
+        return [word[0] for word in word_tag if word[1] in tags]
+
+    # 共现关系：同一句（或窗口、段落，见 CoOccurrence）中两两出现的词语，保持第一次出现的顺序
+    def extract_relation_co(self, annotation, node):
+        pairs = self.co_occurrence.pairs(annotation, self.sentence_words(annotation, node), self._co_positions(annotation, node))
+        return [(word1, word2, "co") for word1, word2 in pairs]
+
+    # 共现关系的计数，不生成逐次出现的列表；词语按 vocabulary 中的编号计数
+    def count_relation_co(self, annotation, node, vocabulary, counts=None):
+        return self.co_occurrence.count(annotation, self.sentence_words(annotation, node), vocabulary, counts=counts,
+                                        sentence_positions=self._co_positions(annotation, node))
+
+    def _co_positions(self, annotation, node):
+        # only the window scope looks at the positions
+        return self.sentence_positions(annotation, node) if self.co_occurrence.scope == "window" else None
+
+    def extract_relation_noun_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "noun"), "noun")
+
+    def extract_relation_noun_phrase_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "noun_phrase"), "noun_phrase")
+
+    def extract_relation_keyword_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "keyword"), "keyword")
+
+    def extract_relation_adj_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "adj"), "adj")
+
+    def extract_relation_verb_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "verb"), "verb")
+
+    def extract_relation_ner_co(self, text):
+        return self.extract_relation_co(self.annotate(text, "ner"), "ner")
+
+    # wordnet 关系：全文中两两词语的 wordnet 相似度，见 WordNetSimilarity
+    def extract_relation_wordnet(self, annotation, node):
+        return [(word1, word2, "wordnet", similarity)
+                for word1, word2, similarity in self.wordnet.relations(self.extract_nodes(annotation, node))]
+
+    # embedding 关系：每个词与词向量余弦相似度最高的 embedding_top_k 个词
+    def extract_relation_embedding(self, annotation, node):
+        neighbours = embedding_neighbours(self.extract_nodes(annotation, node), self.word_vectors, self.embedding_top_k, self.embedding_block_size)
+        return [(word1, word2, "embedding", similarity) for word1, word2, similarity in neighbours]
+
+    def extract_relation_noun_wordnet(self, text):
+        return self.extract_relation_wordnet(self.annotate(text, "noun"), "noun")
+
+    def extract_relation_adj_wordnet(self, text):
+        return self.extract_relation_wordnet(self.annotate(text, "adj"), "adj")
+
+    def extract_relation_verb_wordnet(self, text):
+        return self.extract_relation_wordnet(self.annotate(text, "verb"), "verb")
+
+    def extract_relation_keyword_wordnet(self, text):
+        return self.extract_relation_wordnet(self.annotate(text, "keyword"), "keyword")
+
+    def wordnet_similarity(self, word1, word2):
+        return self.wordnet.similarity(word1, word2)
+
+
+# get_pipeline options -> NLPPipeline, and cache path -> AnnotationCache
+_pipelines: Dict[Tuple, 'NLPPipeline'] = {}
+_caches: Dict[str, AnnotationCache] = {}
+
+
+def pipeline_options(**options):
+    """the options of get_pipeline with the module defaults, as they are now, filled in for the ones not given"""
+    result = {'cache_path': ANNOTATION_CACHE_PATH, 'normalize': NORMALIZE, 'np_backend': NP_BACKEND, 'co_scope': CO_SCOPE, 'co_window': CO_WINDOW,
+              'wordnet_threshold': WORDNET_THRESHOLD, 'wordnet_top_k': WORDNET_TOP_K, 'embedding_top_k': EMBEDDING_TOP_K,
+              'embedding_block_size': EMBEDDING_BLOCK_SIZE}
+    result.update(options)
+    result['cache_path'] = str(result['cache_path']) if result['cache_path'] else None
+    result['normalize'] = tuple(result['normalize'])
     return result
 
 
+def get_pipeline(**options):
+    """return the NLPPipeline of options, shared by the module functions below and by network construction.
+    options are the arguments of NLPPipeline, with cache_path (the path of an AnnotationCache, None for no cache)
+    in place of cache; one pipeline is kept for every distinct options"""
+    options = pipeline_options(**options)
+    key = tuple(sorted(options.items()))
+    if key not in _pipelines:
+        cache_path = options['cache_path']
+        if cache_path is not None and cache_path not in _caches:
+            _caches[cache_path] = AnnotationCache(cache_path)
+        _pipelines[key] = NLPPipeline(cache=_caches.get(cache_path), normalize=options['normalize'], np_backend=options['np_backend'],
+                                      co_scope=options['co_scope'], co_window=options['co_window'],
+                                      wordnet_threshold=options['wordnet_threshold'], wordnet_top_k=options['wordnet_top_k'],
+                                      embedding_top_k=options['embedding_top_k'], embedding_block_size=options['embedding_block_size'])
+    return _pipelines[key]
+
+
+# the Word2VecRegistry of get_registry, created on first use
+_registries: Dict[str, Word2VecRegistry] = {}
+
+
+def get_registry():
+    """return the Word2VecRegistry shared by the module functions below"""
+    if 'default' not in _registries:
+        _registries['default'] = Word2VecRegistry()
+    return _registries['default']
+
+
+def extract_keyword(text):
+    return get_pipeline().extract_keyword(text)
+
+
 def extract_keyword2(text):
-    r = Rake()
-    r.extract_keywords_from_text(text)
-    result = list(r.get_word_degrees().keys())
-    return result
+    return get_pipeline().extract_keyword2(text)
 
 
 def extract_word(text):
-    words = nltk.word_tokenize(text)
-    return words
+    return get_pipeline().extract_word(text)
 
 
 def extract_noun(text):
-    sentences = splitSentence(text)
-    noun = []
-    for sentence in sentences:
-        words = nltk.word_tokenize(sentence)
-        word_tag = nltk.pos_tag(words)
-        for word in word_tag:
-            if word[1] == "NN" or word[1] == "NNP":
-                noun.append(word[0])
-    return noun
+    return get_pipeline().extract_noun(text)
 
 
 def extract_noun2(text):
-    words = nltk.word_tokenize(text)
-    word_tag = nltk.pos_tag(words)
-    noun = []
-    for word in word_tag:
-        if word[1] == "NN" or word[1] == "NNP":
-            noun.append(word[0])
-    return noun
+    return get_pipeline().extract_noun2(text)
 
 
 def extract_word_freq(text):
-    words = nltk.word_tokenize(text)
-    freq = nltk.FreqDist(words)
-    return freq
+    return get_pipeline().extract_word_freq(text)
 
 
 def extract_adj(text):
-    sentences = splitSentence(text)
-    adj = []
-    for sentence in sentences:
-        words = nltk.word_tokenize(sentence)
-        word_tag = nltk.pos_tag(words)
-        for word in word_tag:
-            if word[1] == "JJ":
-                adj.append(word[0])
-    return adj
+    return get_pipeline().extract_adj(text)
 
 
 def extract_adj2(text):
-    words = nltk.word_tokenize(text)
-    word_tag = nltk.pos_tag(words)
-    adj = []
-    for word in word_tag:
-        if word[1] == "JJ":
-            adj.append(word[0])
-    return adj
+    return get_pipeline().extract_adj2(text)
 
 
 def extract_verb(text):
-    sentences = splitSentence(text)
-    verb = []
-    for sentence in sentences:
-        words = nltk.word_tokenize(sentence)
-        word_tag = nltk.pos_tag(words)
-        for word in word_tag:
-            if word[1] == "VB":
-                verb.append(word[0])
-    return verb
+    return get_pipeline().extract_verb(text)
 
 
 def extract_verb2(text):
-    words = nltk.word_tokenize(text)
-    word_tag = nltk.pos_tag(words)
-    verb = []
-    for word in word_tag:
-        if word[1] == "VB":
-            verb.append(word[0])
-    return verb
+    return get_pipeline().extract_verb2(text)
 
 
 def extract_noun_phrase(text):
-    sentences = splitSentence(text)
-    noun_phrases = []
-    for sentence in sentences:
-        nounphrase_tb = TextBlob(sentence)
-        noun_phrases += nounphrase_tb.noun_phrases
-    return noun_phrases
+    return get_pipeline().extract_noun_phrase(text)
 
 
 def extract_noun_phrase2(text):
-    nounphrase_tb = TextBlob(text)
-    return nounphrase_tb.noun_phrases
+    return get_pipeline().extract_noun_phrase2(text)
 
 
 def extract_ner(text):
-    sentences = splitSentence(text)
-    # tokens = nltk.word_tokenize('I am very excited about the next generation of Apple products.')
-    # tokens = nltk.pos_tag(tokens)
-    # tree = nltk.ne_chunk(tokens)
-    # print(tree)
-    ner = []
-    for sentence in sentences:
-        words = nltk.word_tokenize(sentence)
-        word_tag = nltk.pos_tag(words)
-        for word in word_tag:
-            if word[1] == "NNP":
-                ner.append(word[0])
-    return ner
+    return get_pipeline().extract_ner(text)
 
 
 def extract_ner2(text):
-    # tokens = nltk.word_tokenize('I am very excited about the next generation of Apple products.')
-    # tokens = nltk.pos_tag(tokens)
-    # tree = nltk.ne_chunk(tokens)
-    # print(tree)
-    words = nltk.word_tokenize(text)
-    word_tag = nltk.pos_tag(words)
-    ner = []
-    for word in word_tag:
-        if word[1] == "NNP":
-            ner.append(word[0])
-    return ner
+    return get_pipeline().extract_ner2(text)
 
 
 def splitSentence(paragraph):
-    tokenizer = nltk.data.load('tokenizers/punkt/english.pickle')
-    sentences = tokenizer.tokenize(paragraph)
-    return sentences
+    return get_pipeline().split_sentence(paragraph)
 
 
 def wordtokenizer(sentence):
-    words = WordPunctTokenizer().tokenize(sentence)
-    return words
+    return get_pipeline().word_punct_tokenize(sentence)
 
 
 def para2senc2words(text):
-    sen = splitSentence(text)
-    result = []
-    for i in sen:
-        words = wordtokenizer(i)
-        result.append(words)
-    return result
+    return get_pipeline().para2senc2words(text)
 
 
 def extract_relation_noun_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_noun2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp)-1):
-                for j in range(i+1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_noun_co(text)
 
 
 def extract_relation_noun_phrase_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_noun_phrase2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp)-1):
-                for j in range(i+1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_noun_phrase_co(text)
 
 
 def extract_relation_keyword_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_keyword2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp) - 1):
-                for j in range(i + 1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_keyword_co(text)
 
 
 def extract_relation_adj_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_adj2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp)-1):
-                for j in range(i+1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_adj_co(text)
 
 
 def extract_relation_verb_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_verb2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp)-1):
-                for j in range(i+1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_verb_co(text)
 
 
 def extract_relation_ner_co(text):
-    sentences = splitSentence(text)
-    relation = []
-    for sentence in sentences:
-        words = extract_ner2(sentence)
-        temp = []
-        for word in words:
-            if word not in temp:
-                temp.append(word)
-        if len(temp) >= 2:
-            for i in range(0, len(temp)-1):
-                for j in range(i+1, len(temp)):
-                    relation.append((temp[i], temp[j], "co"))
-    return relation
+    return get_pipeline().extract_relation_ner_co(text)
 
 
 def extract_relation_noun_wordnet(text):
-    words = extract_noun(text)
-    temp = []
-    relation = []
-    for word in words:
-        if word not in temp:
-            temp.append(word)
-    if len(temp) >= 2:
-        for i in range(0, len(temp)-1):
-            for j in range(i+1, len(temp)):
-                if wordnet_similarity(temp[i], temp[j]):
-                    similarity = wordnet_similarity(temp[i], temp[j])
-                    relation.append((temp[i], temp[j], "wordnet", similarity))
-    return relation
+    return get_pipeline().extract_relation_noun_wordnet(text)
 
 
 def extract_relation_adj_wordnet(text):
-    words = extract_adj(text)
-    temp = []
-    relation = []
-    for word in words:
-        if word not in temp:
-            temp.append(word)
-    if len(temp) >= 2:
-        for i in range(0, len(temp)-1):
-            for j in range(i+1, len(temp)):
-                if wordnet_similarity(temp[i], temp[j]):
-                    similarity = wordnet_similarity(temp[i], temp[j])
-                    relation.append((temp[i], temp[j], "wordnet", similarity))
-    return relation
+    return get_pipeline().extract_relation_adj_wordnet(text)
 
 
 def extract_relation_verb_wordnet(text):
-    words = extract_verb(text)
-    temp = []
-    relation = []
-    for word in words:
-        if word not in temp:
-            temp.append(word)
-    if len(temp) >= 2:
-        for i in range(0, len(temp)-1):
-            for j in range(i+1, len(temp)):
-                if wordnet_similarity(temp[i], temp[j]):
-                    similarity = wordnet_similarity(temp[i], temp[j])
-                    relation.append((temp[i], temp[j], "wordnet", similarity))
-    return relation
+    return get_pipeline().extract_relation_verb_wordnet(text)
 
 
 def extract_relation_keyword_wordnet(text):
-    words = extract_keyword(text)
-    temp = []
-    relation = []
-    for word in words:
-        if word not in temp:
-            temp.append(word)
-    if len(temp) >= 2:
-        for i in range(0, len(temp)-1):
-            for j in range(i+1, len(temp)):
-                if wordnet_similarity(temp[i], temp[j]):
-                    similarity = wordnet_similarity(temp[i], temp[j])
-                    relation.append((temp[i], temp[j], "wordnet", similarity))
-    return relation
+    return get_pipeline().extract_relation_keyword_wordnet(text)
 
 
 def word2vec_initialize(text):
-    # sent = para2senc2words(text)
-    # print(sent)
-    # open('corpus.txt','w').write(text)
-    # sentences = word2vec.Text8Corpus("corpus.txt")
-    sentences = para2senc2words(text)
-    model = word2vec.Word2Vec(sentences, size=100, window=5, min_count=1, workers=4)
-    model.save("knowledgeB.model")
+    get_registry().initialize(para2senc2words(text))
     return 0
 
 
-# this function doesn't work now!!!! And I reaaly can't find out why.
 def word2vec_trainmore(text):
-    text = para2senc2words(text)
-    model = word2vec.Word2Vec.load("knowledgeB.model")
-    model.train(text, total_examples=1, epochs=1)
+    get_registry().train_more(para2senc2words(text))
     return 0
 
 
 def word2vec_result(word):
-    new_model = word2vec.Word2Vec.load("knowledgeB.model")
-    # print(new_model[word])
-    return new_model[word]
+    return get_registry().vectors()[word]
+
+
+# the vectors of several words at once, see Word2VecRegistry.lookup
+def word2vec_results(words):
+    return get_registry().lookup(words)
 
 
 # 词干提取 fishing-fish shops-shop
 def word_stem(word):
-    s = nltk.stem.SnowballStemmer('english')
-    if s.stem(word):
-        return s.stem(word)
-    return word
+    return get_pipeline().word_stem(word)
 
 
 # 词形还原 octopi-octopus
 def word_lemmatized(word):
-    w = Word(word)
-    return w.lemmatize()
+    return get_pipeline().word_lemmatized(word)
 
 
 # 返回一个词语所在的词语集合，一个词语会在多个词语集合中
@@ -456,15 +1372,7 @@ def wordnet_lemma_names(wordset):
 
 
 def wordnet_similarity(word1, word2):
-    worda = word_stem(word1)
-    wordb = word_stem(word2)
-    if wordnet_synsets(worda) != 1 and wordnet_synsets(wordb) != 1:
-        word1_synsets = wordnet_synsets(worda)
-        word2_synsets = wordnet_synsets(wordb)
-        word1_synset = word1_synsets[0]
-        word2_synset = word2_synsets[0]
-        return word1_synset.path_similarity(word2_synset)
-    return 0
+    return get_pipeline().wordnet_similarity(word1, word2)
 # if __name__ == '__main__':
     # print(para2senc2words('I am very excited about the next generation of Apple products. But
     #  I am csk! So I am not afraid of you. I am very excited about the next generation of
@@ -14,11 +14,13 @@ def create_db(database_name):
 
 # 此方法用于建立词语网络
 # 参数node：字符串类型，取值为 "noun" / "adj" / "verb" / "noun_phrase" / "keyword" / "ner"
-# 参数relation：字符串类型，取值为 "co" / "wordnet"，前者表示基于词语共现信息提取关系；后者基于wordnet，但是后者速度十分缓慢，建议数据量<10篇文档。
+# 参数relation：字符串类型，取值为 "co" / "wordnet" / "embedding"，"co" 表示基于词语共现信息提取关系；"wordnet" 基于wordnet，但是速度十分缓慢，建议数据量<10篇文档；
+# "embedding" 把每个词与 word2vec 模型（algorithm.WORD2VEC_MODEL）中余弦相似度最高的若干个词相连。
 # 参数document：字符串类型，表示所取的文档的范围，取值示例 "1-10" / "1-10_20-30"
 # 参数database：字符串类型，为您已经建立好的图数据库的名称
-def text_network(node, relation, document, database):
-    nw.create_network_text("ScienceDirectDataSource", document, node, relation, database)
+# 其余关键字参数（normalize / np_backend / cache_path 等）选择自然语言处理流水线的选项，见 algorithm.get_pipeline
+def text_network(node, relation, document, database, **options):
+    nw.create_network_text("ScienceDirectDataSource", document, node, relation, database, **options)
 
 
 # 此方法用于建立作者网络
@@ -51,6 +51,12 @@ def insert_word(node_key, node_struct, database_name):
     return 1
 
 
+# bulk insert_word: nodes is a list of (node_key, node_struct); nodes already in the graph are skipped
+def insert_words(nodes, database_name):
+    graph = nxds.read_graph(database_name)[database_name]
+    return nxds.create_nodes_from(database_name, [(node_key, node_struct) for node_key, node_struct in nodes if node_key not in graph])
+
+
 def insert_paper_relation(node1_key, node2_key, relation_struct, database_name):
     if nxds.read_edge({(database_name, (node1_key, node2_key)): {}}):
         relation_struct_ori = nxds.read_edge({(database_name, (node1_key, node2_key)): {}})
@@ -102,6 +108,21 @@ def update_word_relation(node1_key, node2_key, relation_struct, database_name):
     nxds.update_edge({(database_name, (node1_key, node2_key)): {}}, relation_struct)
 
 
+# bulk insert of word relations: relations is a list of (node1_key, node2_key, relation_struct) whose relation_struct has the count;
+# an edge already in the graph keeps its struct and only its count is increased; everything is written in one create_edges_from
+def insert_word_relations(relations, database_name):
+    graph = nxds.read_graph(database_name)[database_name]
+    edges = []
+    for node1_key, node2_key, relation_struct in relations:
+        relation_struct_ori = graph.get_edge_data(node1_key, node2_key)
+        if relation_struct_ori is not None:
+            # create_edges_from updates the struct of an existing edge, so only the count is given
+            edges.append((node1_key, node2_key, {'count': relation_struct_ori['count'] + relation_struct['count']}))
+        else:
+            edges.append((node1_key, node2_key, relation_struct))
+    return nxds.create_edges_from(database_name, edges)
+
+
 def insert_paper_author_relation(node1_key, node2_key, relation_struct, database_name):
     nxds.create_edge({(database_name, (node1_key, node2_key)): {}}, relation_struct)
 
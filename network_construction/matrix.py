@@ -0,0 +1,171 @@
+# encoding:utf-8
+# 稀疏共现矩阵：整个语料的词表映射为整数编号，共现次数累加到 scipy.sparse 矩阵中，
+# 矩阵可以直接做 PMI / NPMI 等向量化加权，也可以一次性导出为 networkx 图或写入图数据库
+from collections import OrderedDict
+import networkx as nx
+import numpy as np
+from scipy import sparse
+from . import source as s
+from . import database as db
+from . import algorithm
+
+# pending (row, col) pairs are summed into the matrix once there are this many
+FLUSH_SIZE = 1 << 22
+
+
+class CooccurrenceMatrix:
+    """
+        语料级的词语共现矩阵，词语编号按第一次出现的顺序分配，
+        词对 (i, j) 只记在 i < j 的上三角中，计数规则与 algorithm.CoOccurrence 相同
+    """
+    def __init__(self, node, scope=None, window=None, pipeline=None):
+        self.node = node
+        self.pipeline = pipeline or algorithm.get_pipeline()
+        # the co_scope and co_window of the pipeline when not given
+        self.scope = scope or self.pipeline.co_scope
+        self.window = window or self.pipeline.co_window
+        if self.scope not in algorithm.CO_SCOPES:
+            raise ValueError(f'Unknown co-occurrence scope: {self.scope}')
+        # word -> id, and id -> word
+        self.index = {}
+        self.vocabulary = []
+        self._rows = []
+        self._cols = []
+        self._pending = 0
+        # the summed upper triangle so far, as coo triplets
+        self._summed = (np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64))
+
+    def _ids(self, words):
+        ids = np.empty(len(words), dtype=np.int64)
+        for k, word in enumerate(words):
+            word_id = self.index.get(word)
+            if word_id is None:
+                word_id = self.index[word] = len(self.vocabulary)
+                self.vocabulary.append(word)
+            ids[k] = word_id
+        return ids
+
+    def add(self, annotation):
+        """count the co-occurrences of the node words of one annotated document"""
+        sentence_words = self.pipeline.sentence_words(annotation, self.node)
+        if self.scope == "window":
+            for words, positions in zip(sentence_words, self.pipeline.sentence_positions(annotation, self.node)):
+                ids = self._ids(words)
+                positions = np.asarray(positions, dtype=np.int64)
+                # the positions increase, so words less than window positions apart are less than window words apart
+                for offset in range(1, min(self.window, len(ids))):
+                    near = positions[offset:] - positions[:-offset] < self.window
+                    self._append(ids[:-offset][near], ids[offset:][near])
+            return self
+        if self.scope == "paragraph":
+            sentence_words = annotation.by_paragraph(sentence_words)
+        for words in sentence_words:
+            # the ids of the distinct words, in first-seen order
+            ids = self._ids(list(OrderedDict.fromkeys(words)))
+            first, second = np.triu_indices(len(ids), 1)
+            self._append(ids[first], ids[second])
+        return self
+
+    def add_all(self, annotations):
+        for annotation in annotations:
+            self.add(annotation)
+        return self
+
+    def _append(self, ids1, ids2):
+        different = ids1 != ids2
+        ids1 = ids1[different]
+        ids2 = ids2[different]
+        if ids1.size == 0:
+            return
+        self._rows.append(np.minimum(ids1, ids2))
+        self._cols.append(np.maximum(ids1, ids2))
+        self._pending += len(ids1)
+        if self._pending >= FLUSH_SIZE:
+            self._flush()
+
+    def _flush(self):
+        if not self._rows:
+            return
+        rows, cols, data = self._summed
+        rows = np.concatenate([rows] + self._rows)
+        cols = np.concatenate([cols] + self._cols)
+        data = np.concatenate([data, np.ones(self._pending, dtype=np.int64)])
+        size = len(self.vocabulary)
+        summed = sparse.coo_matrix((data, (rows, cols)), shape=(size, size))
+        summed.sum_duplicates()
+        self._summed = (summed.row.astype(np.int64), summed.col.astype(np.int64), summed.data)
+        self._rows = []
+        self._cols = []
+        self._pending = 0
+
+    @property
+    def matrix(self):
+        """the counts as an upper triangular csr_matrix, matrix[i, j] for i < j is the count of (vocabulary[i], vocabulary[j])"""
+        self._flush()
+        rows, cols, data = self._summed
+        size = len(self.vocabulary)
+        return sparse.csr_matrix((data, (rows, cols)), shape=(size, size))
+
+    def pmi(self, normalized=False):
+        """the (normalized) pointwise mutual information of every counted pair, in the same upper triangular layout.
+        the probabilities are those of the symmetric matrix, a word's marginal is the sum of its co-occurrence counts"""
+        counts = self.matrix.tocoo()
+        marginals = np.asarray((counts + counts.T).sum(axis=1)).ravel()
+        total = 2 * counts.data.sum()
+        joint = counts.data / total
+        values = np.log(joint / (marginals[counts.row] / total) / (marginals[counts.col] / total))
+        if normalized:
+            # a pair that is the only co-occurrence has p = 1, its npmi is 1
+            values = np.divide(values, -np.log(joint), out=np.ones_like(values), where=joint < 1)
+        return sparse.csr_matrix((values, (counts.row, counts.col)), shape=counts.shape)
+
+    def edges(self, weighting=None):
+        """yield the weighted edges (node1_key, node2_key, relation_struct), with 'pmi' or 'npmi' added by weighting"""
+        counts = self.matrix.tocoo()
+        weights = None
+        if weighting is not None:
+            if weighting not in ("pmi", "npmi"):
+                raise ValueError(f'Unknown weighting: {weighting}')
+            weights = self.pmi(weighting == "npmi").tocoo()
+        for k, (i, j, count) in enumerate(zip(counts.row, counts.col, counts.data)):
+            relation_struct = {}
+            relation_struct['relation'] = "co"
+            relation_struct['count'] = int(count)
+            if weights is not None:
+                relation_struct[weighting] = float(weights.data[k])
+            yield "word_" + self.vocabulary[i], "word_" + self.vocabulary[j], relation_struct
+
+    def nodes(self):
+        for w in self.vocabulary:
+            node_struct = {}
+            node_struct['word'] = w
+            node_struct['name'] = w
+            yield "word_" + w, node_struct
+
+    def to_networkx(self, weighting=None):
+        """a networkx Graph of the words and their co-occurrences, in the node and edge format of database.py"""
+        graph = nx.Graph()
+        graph.add_nodes_from(self.nodes())
+        graph.add_edges_from(self.edges(weighting))
+        return graph
+
+    def to_database(self, database, weighting=None):
+        """write the words and co-occurrences to the graph database in one bulk insert each,
+        the counts of edges already in the graph are increased"""
+        db.insert_words(list(self.nodes()), database)
+        db.insert_word_relations(list(self.edges(weighting)), database)
+        return 0
+
+
+# the co-occurrence matrix of the node words of the documents (a string like 1-100_300-400)
+# options choose the pipeline, see algorithm.get_pipeline
+def build_matrix(source, document, node, *, scope=None, window=None, **options):
+    pipeline = algorithm.get_pipeline(**options)
+    texts = (a['text'] for a in s.iter_records(source, document, ('text',)))
+    return CooccurrenceMatrix(node, scope, window, pipeline).add_all(pipeline.iter_annotations(texts, node))
+
+
+# the co network of create_network_text built through the sparse matrix; weighting = None / "pmi" / "npmi"
+def create_network_text(source, document, node, database, *, scope=None, window=None, weighting=None, **options):
+    build_matrix(source, document, node, scope=scope, window=window, **options).to_database(database, weighting)
+    return 0
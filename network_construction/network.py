@@ -4,6 +4,7 @@ import os
 from data_platform.config import ConfigManager
 from . import node as nd
 from . import relation as rela
+from . import parallel
 
 current_path = Path(os.getcwd())
 data_path = current_path / 'data'
@@ -15,11 +16,17 @@ config = ConfigManager({
 })
 
 
-# node = noun verb adj noun_phrase keyword ner; relation = co wordnet
-# please don't use wordnet now!!! it's too slow
-def create_network_text(source, document, node, relation, database):
-    nd.node_extraction_text(source, document, node, database)
-    rela.relation_extraction_text(source, document, node, relation, database)
+# node = noun verb adj noun_phrase keyword ner; relation = co wordnet embedding
+# wordnet is still much slower than co, the wordnet_threshold and wordnet_top_k options prune its pairs
+# workers > 1 builds the network in that many processes, see parallel.create_network_text
+# options choose the pipeline (normalize, np_backend, cache_path, ...), see algorithm.get_pipeline
+def create_network_text(source, document, node, relation, database, *, workers=0, **options):
+    if workers is None or workers > 1:
+        return parallel.create_network_text(source, document, node, relation, database, workers=workers, **options)
+    # every document is tokenized and tagged once for both stages
+    annotations = nd.annotate_text(source, document, node, **options)
+    nd.node_extraction_text(source, document, node, database, annotations=annotations, **options)
+    rela.relation_extraction_text(source, document, node, relation, database, annotations=annotations, **options)
     return 0
 
 
@@ -18,9 +18,8 @@ config = ConfigManager({
 # the output format is a dictionary; its key is node_key and the properties are id name email;
 # if there is nop author-name, the key is author_null
 def node_extraction_author(source, document, database):
-    authors = s.search_author(source, document)
-    citations = s.search_citation(source, document)
-    for a in authors:
+    records = list(s.iter_records(source, document, ('authors', 'bibliography')))
+    for a in records:
         author_name = a['author_list'][0]
         node_key = "author_" + author_name
         node_struct = {}
@@ -28,7 +27,7 @@ def node_extraction_author(source, document, database):
         node_struct['name'] = author_name
         node_struct['email'] = "null"
         db.insert_author(node_key, node_struct, database)
-    for c in citations:
+    for c in records:
         for value0 in c['bib_detail'].items():
             value = value0[1]
             if 'authors' in value.keys():
@@ -56,9 +55,8 @@ def node_extraction_author(source, document, database):
 # if we can not get a property; the default value is "null"
 # for all the citation papers, if there is no bib_number property, the default number is -1
 def node_extraction_paper(source, document, database):
-    all_ = s.search_all(source, document)
-    citations = s.search_citation(source, document)
-    for a in all_:
+    records = list(s.iter_records(source, document, ('doi', 'title', 'authors', 'bibliography')))
+    for a in records:
         doc_doi = a['doc_doi']
         node_key = "paper_" + doc_doi
         node_struct = {}
@@ -68,7 +66,7 @@ def node_extraction_paper(source, document, database):
         node_struct['author_number'] = a['author_number']
         node_struct['bib_number'] = a['bib_number']
         db.insert_paper(node_key, node_struct, database)
-    for c in citations:
+    for c in records:
         for value0 in c['bib_detail'].items():
             value = value0[1]
             if 'doi' in value.keys():
@@ -92,69 +90,29 @@ def node_extraction_paper(source, document, database):
     return 0
 
 
+# tokenize and tag every document once; the annotations are shared by node and relation extraction
+# with node, the documents are only tokenized and tagged if the words of that node type need the POS tags
+# options choose the pipeline, see algorithm.get_pipeline
+def annotate_text(source, document, node=None, **options):
+    pipeline = algorithm.get_pipeline(**options)
+    texts = (a['text'] for a in s.iter_records(source, document, ('text',)))
+    return list(pipeline.iter_annotations(texts, node))
+
+
 # the "node" argument's value can be "noun"/"adj"/"verb"/"noun_phrase"/"keyword"/"ner"
-def node_extraction_text(source, document, node, database):
-    text = s.search_text(source, document)
-    if node == "noun":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_noun(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
-    if node == "adj":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_adj(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
-    if node == "keyword":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_keyword(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
-    if node == "noun_phrase":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_noun_phrase(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
-    if node == "ner":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_ner(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
-    if node == "verb":
-        for a in text:
-            all_text = a['text']
-            words = algorithm.extract_verb(all_text)
-            for w in words:
-                node_key = "word_" + w
-                node_struct = {}
-                node_struct['word'] = w
-                node_struct['name'] = w
-                db.insert_word(node_key, node_struct, database)
+# annotations is the result of annotate_text, it is computed here when not given
+def node_extraction_text(source, document, node, database, *, annotations=None, **options):
+    if annotations is None:
+        annotations = annotate_text(source, document, node, **options)
+    pipeline = algorithm.get_pipeline(**options)
+    for annotation in annotations:
+        words = pipeline.extract_nodes(annotation, node)
+        for w in words:
+            node_key = "word_" + w
+            node_struct = {}
+            node_struct['word'] = w
+            node_struct['name'] = w
+            db.insert_word(node_key, node_struct, database)
     return 0
 
 # if __name__ == '__main__':
@@ -0,0 +1,64 @@
+# encoding:utf-8
+# 多进程构建文本网络：每个进程处理一篇文档，返回这篇文档的节点和关系计数，
+# 主进程按文档顺序合并后一次性写入图，结果与串行构建（network.create_network_text）相同
+import os
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
+from . import source as s
+from . import database as db
+from . import algorithm
+from . import relation as rela
+
+
+def extract_document(text, node, relation, options):
+    """annotate one document and extract its nodes and relations with the pipeline of options, runs in the worker processes.
+    return (words, node_count, counts, structs): the vocabulary of the document, whose first node_count words are
+    the node words in first-seen order, and relation.document_relations on the ids of that vocabulary"""
+    pipeline = algorithm.get_pipeline(**options)
+    annotation = pipeline.annotate(text, node)
+    # the ids are local to the document, merge_documents maps them to the ids of the whole network
+    vocabulary = algorithm.Vocabulary()
+    vocabulary.ids(pipeline.extract_nodes(annotation, node))
+    node_count = len(vocabulary)
+    counts, structs = rela.document_relations(pipeline, annotation, node, relation, vocabulary)
+    return vocabulary.words, node_count, counts, structs
+
+
+def merge_documents(results):
+    """merge the extract_document results in document order.
+    return the nodes [(node_key, node_struct)] and relations [(node1_key, node2_key, relation_struct)]
+    in the order the serial construction creates them"""
+    vocabulary = algorithm.Vocabulary()
+    nodes = OrderedDict()
+    relation_results = []
+    for doc_words, doc_node_count, doc_counts, doc_structs in results:
+        ids = vocabulary.ids(doc_words)
+        for word_id in ids[:doc_node_count]:
+            if word_id not in nodes:
+                node_struct = {}
+                node_struct['word'] = vocabulary.words[word_id]
+                node_struct['name'] = vocabulary.words[word_id]
+                nodes[word_id] = node_struct
+        relation_results.append(({(ids[id1], ids[id2]): count for (id1, id2), count in doc_counts.items()},
+                                 {(ids[id1], ids[id2]): struct for (id1, id2), struct in doc_structs.items()}))
+    return [(vocabulary.node_key(word_id), node_struct) for word_id, node_struct in nodes.items()], rela.merge_relations(relation_results, vocabulary)
+
+
+def create_network_text(source, document, node, relation, database, *, workers=None, chunksize=1, **options):
+    """the same network as network.create_network_text, documents are annotated by workers processes
+    (None uses every core) and the graph is written in one bulk insert of nodes and one of relations"""
+    workers = workers or os.cpu_count() or 1
+    # the module defaults are filled in here, so that the workers use the same pipeline whatever they inherit
+    options = algorithm.pipeline_options(**options)
+    texts = [a['text'] for a in s.iter_records(source, document, ('text',))]
+    if relation == "embedding":
+        # open the memory mapped vectors before forking, the workers share them instead of each writing and loading them
+        algorithm.get_registry().vectors(algorithm.WORD2VEC_MODEL)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(extract_document, texts, repeat(node), repeat(relation), repeat(options), chunksize=chunksize))
+
+    nodes, relations = merge_documents(results)
+    db.insert_words(nodes, database)
+    db.insert_word_relations(relations, database)
+    return 0
@@ -1,10 +1,12 @@
 # encoding:utf-8
 import os
+from collections import Counter, OrderedDict
 from pathlib import Path
 from data_platform.config import ConfigManager
 from . import source as s
 from . import database as db
 from . import algorithm
+from . import node as nd
 current_path = Path(os.getcwd())
 data_path = current_path / 'data'
 xml_path = data_path / 'unprocessed_articles_xml'
@@ -17,218 +19,92 @@ config = ConfigManager({
 
 # node == "noun" , relation = "co"表示名词的共现关系，暂时只实现这一种，后续的根据需求再增加
 # node == "noun" , realtion = "wordnet"表示名词，使用的关系是由wordnet得到的词语在wordnet中的相似性
-def relation_extraction_text(source, document, node, relation, database):
-    text = s.search_text(source, document)
-    if node == "noun" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_noun_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                # relation_struct = db.search_word_relation(node1_key,node2_key, database)
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "noun_phrase" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_noun_phrase_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "keyword" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_keyword_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "verb" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_verb_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "adj" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_adj_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "ner" and relation == "co":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_ner_co(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "noun" and relation == "wordnet":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_noun_wordnet(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['similarity'] = r[3]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "adj" and relation == "wordnet":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_adj_wordnet(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['similarity'] = r[3]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "verb" and relation == "wordnet":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_verb_wordnet(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['similarity'] = r[3]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
-    if node == "keyword" and relation == "wordnet":
-        for a in text:
-            all_text = a['text']
-            relation = algorithm.extract_relation_keyword_wordnet(all_text)
-            for r in relation:
-                node1_key = "word_" + r[0]
-                node2_key = "word_" + r[1]
-                relation_struct_ori = db.search_word_relation(node1_key, node2_key, database)
-                if relation_struct_ori:
-                    relation_struct = relation_struct_ori.values()
-                    relation_struct = list(relation_struct)[0]
-                else:
-                    relation_struct = {}
-                if relation_struct:
-                    relation_struct['count'] += 1
-                    db.update_word_relation(node1_key, node2_key, relation_struct, database)
-                else:
-                    relation_struct['relation'] = r[2]
-                    relation_struct['similarity'] = r[3]
-                    relation_struct['count'] = 1
-                    db.insert_word_relation(node1_key, node2_key, relation_struct, database)
+# annotations is the result of node.annotate_text, it is computed here when not given
+CO_NODES = ("noun", "noun_phrase", "keyword", "verb", "adj", "ner")
+WORDNET_NODES = ("noun", "adj", "verb", "keyword")
+# relation = "embedding" links every word to its nearest words in the word2vec model, see algorithm.embedding_neighbours
+EMBEDDING_NODES = CO_NODES
+
+
+# the pipeline method extracting this relation between the node words, None if it is not supported
+def relation_extractor(pipeline, node, relation):
+    if relation == "co" and node in CO_NODES:
+        return pipeline.extract_relation_co
+    if relation == "wordnet" and node in WORDNET_NODES:
+        return pipeline.extract_relation_wordnet
+    if relation == "embedding" and node in EMBEDDING_NODES:
+        return pipeline.extract_relation_embedding
+    return None
+
+
+# the relations of one annotated document: (Counter {(id1, id2): count}, {(id1, id2): relation_struct without count}),
+# the words interned to their ids in vocabulary (algorithm.Vocabulary) and each pair oriented as first seen;
+# co relations are counted by algorithm.CoOccurrence without listing every occurrence
+def document_relations(pipeline, annotation, node, relation, vocabulary):
+    extract = relation_extractor(pipeline, node, relation)
+    if extract is None:
+        return Counter(), {}
+    if relation == "co":
+        counts = pipeline.count_relation_co(annotation, node, vocabulary)
+        return counts, dict.fromkeys(counts, {'relation': "co"})
+
+    counts = Counter()
+    structs = {}
+    oriented = {}
+    for r in extract(annotation, node):
+        pair = (vocabulary.add(r[0]), vocabulary.add(r[1]))
+        # the graph is undirected, (a, b) and (b, a) are the same edge
+        pair_key = frozenset(pair)
+        if pair_key not in oriented:
+            oriented[pair_key] = pair
+            relation_struct = {}
+            relation_struct['relation'] = r[2]
+            if len(r) > 3:
+                # wordnet and embedding relation
+                relation_struct['similarity'] = r[3]
+            structs[oriented[pair_key]] = relation_struct
+        counts[oriented[pair_key]] += 1
+    return counts, structs
+
+
+# merge the document_relations of the documents in order into the weighted edges [(node1_key, node2_key, relation_struct)],
+# in the order their first occurrences are met; the pairs are merged on their ids and the node keys made from vocabulary at the end
+def merge_relations(results, vocabulary):
+    oriented = OrderedDict()
+    counts = Counter()
+    structs = {}
+    for doc_counts, doc_structs in results:
+        for pair, count in doc_counts.items():
+            pair_key = frozenset(pair)
+            if pair_key not in oriented:
+                oriented[pair_key] = pair
+                structs[pair] = doc_structs[pair]
+            counts[oriented[pair_key]] += count
+
+    relations = []
+    for pair in oriented.values():
+        relation_struct = dict(structs[pair])
+        relation_struct['count'] = counts[pair]
+        relations.append((vocabulary.node_key(pair[0]), vocabulary.node_key(pair[1]), relation_struct))
+    return relations
+
+
+# the relations of every document are counted first, then only the final weighted edges are written
+def relation_extraction_text(source, document, node, relation, database, *, annotations=None, **options):
+    pipeline = algorithm.get_pipeline(**options)
+    if relation_extractor(pipeline, node, relation) is None:
+        return 0
+
+    if annotations is None:
+        annotations = nd.annotate_text(source, document, node, **options)
+    vocabulary = algorithm.Vocabulary()
+    results = (document_relations(pipeline, annotation, node, relation, vocabulary) for annotation in annotations)
+    db.insert_word_relations(merge_relations(results, vocabulary), database)
     return 0
 
 
 def relation_extraction_paper(source, document, relation, database):
-    all_ = s.search_all(source, document)
+    all_ = s.iter_records(source, document, ('doi', 'title', 'bibliography'))
     if relation == "cite":
         for a in all_:
             node1_doc_doi = "paper_" + str(a['doc_doi'])
@@ -253,7 +129,7 @@ def relation_extraction_paper(source, document, relation, database):
 
 # relation = "all"此时暂时实现all，表示抽取共著和引用关系的作者
 def relation_extraction_author(source, document, relation, database):
-    all_ = s.search_all(source, document)
+    all_ = s.iter_records(source, document, ('authors', 'bibliography'))
     if relation == "all":
         for a in all_:
             node1_author = a['author_list']
@@ -332,7 +208,7 @@ def relation_extraction_author(source, document, relation, database):
 
 # relation = "paper_author"
 def relation_extraction_paper_author(source, document, relation, database):
-    all_ = s.search_all(source, document)
+    all_ = s.iter_records(source, document, ('authors',))
     if relation == "paper_author":
         for a in all_:
             node1_doc_doi = "paper_" + str(a['doc_id'])
@@ -351,7 +227,7 @@ def relation_extraction_paper_author(source, document, relation, database):
 
 # relation = "paper_word"
 def relation_extraction_paper_word(source, document, relation, database):
-    all_ = s.search_all(source, document)
+    all_ = s.iter_records(source, document, ('text',))
     if relation == "paper_word":
         for a in all_:
             node1_doc_doi = "paper_" + str(a['doc_id'])
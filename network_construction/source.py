@@ -4,173 +4,201 @@
 # import data_platform as dp
 # from data_platform.datasource import ScienceDirectDS as ScienceDirectDataSource
 # from utils.datasource import OrientDBDataSource
+import hashlib
 import os
+from collections import OrderedDict
 from pathlib import Path
 from data_platform.config import ConfigManager
+from data_platform.datasource.abc.doc import DocKeyPair
 from data_platform.datasource.science_direct import ScienceDirectDS
+from data_platform.datasource.science_direct_index import ScienceDirectIndex
 current_path = Path(os.getcwd())
 data_path = current_path / 'data'
 xml_path = data_path / 'unprocessed_articles_xml'
+# metadata indexes (doi, title, creator, references) of the corpora, one sqlite file per source directory
+index_path = data_path / 'metadata_index'
 config = ConfigManager({
     "init": {
         "location": xml_path
     }
 })
 
+# corpora shared by every search function and construction stage, keyed on the source directory,
+# least recently used first; changed files are detected per file by the data source manifest
+CORPUS_CACHE_SIZE = 4
+_corpus_cache: 'OrderedDict[str, Corpus]' = OrderedDict()
 
-def search_author(source, document):
-    """source(STRING) is the name of the database; document is a string just like 1-100_300-400"""
-    if source == "ScienceDirectDataSource":
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-
-    else:
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-    doc_num = document.split('_')
-    author_struct_array = []
-    for doc_num_iter in doc_num:
+
+class Corpus:
+    """a ScienceDirect directory whose documents are parsed on first request and then kept"""
+
+    def __init__(self, location):
+        self.ds = ScienceDirectDS(ConfigManager({
+            "init": {
+                "location": location,
+                "auto_refresh": False
+            }
+        }))
+        self.docs = {}
+        self.location = location
+        self.index = None
+
+    def get_index(self):
+        if self.index is None:
+            index_name = hashlib.sha1(str(Path(self.location).resolve()).encode('utf-8')).hexdigest() + '.sqlite'
+            self.index = ScienceDirectIndex(self.location, index_path / index_name)
+        return self.index
+
+    def update_index(self):
+        """bring the metadata index of the whole directory up to date, read_metadata only updates the requested names"""
+        return self.get_index().update()
+
+    def read_metadata(self, doc_names):
+        """return {doc_name: PaperMeta} for the requested names, served from the metadata index without building the documents;
+        only the requested names are checked for changes and extracted"""
+        index = self.get_index()
+        index.update(doc_names)
+        return index.read(doc_names)
+
+    def read(self, doc_names):
+        """return {doc_name: Document} for the requested names which exist in the corpus"""
+        changes = self.ds.refresh()
+        for doc_name in changes.modified + changes.deleted:
+            self.docs.pop(doc_name, None)
+
+        missing = [doc_name for doc_name in doc_names if doc_name not in self.docs]
+        if missing:
+            docset = self.ds.read_docset([DocKeyPair('_default', doc_name) for doc_name in missing])
+            for (_, doc_name), doc in docset.items():
+                self.docs[doc_name] = doc
+        return {doc_name: self.docs[doc_name] for doc_name in doc_names if doc_name in self.docs}
+
+
+def get_corpus(location=xml_path):
+    """return the shared Corpus of location"""
+    location = str(location)
+    if location in _corpus_cache:
+        _corpus_cache.move_to_end(location)
+        return _corpus_cache[location]
+
+    corpus = Corpus(location)
+    _corpus_cache[location] = corpus
+    while len(_corpus_cache) > CORPUS_CACHE_SIZE:
+        _corpus_cache.popitem(last=False)
+    return corpus
+
+
+def invalidate_corpus(location=None):
+    """drop the cached corpus of location, or every cached corpus if location is None"""
+    if location is None:
+        _corpus_cache.clear()
+        return
+    _corpus_cache.pop(str(location), None)
+
+
+def parse_document_range(document):
+    """turn a document string like 1-100_300-400 into the list of document names it covers"""
+    doc_names = []
+    for doc_num_iter in document.split('_'):
         doc_num_range = doc_num_iter.split('-')
         doc_num_start = doc_num_range[0]
         doc_num_end = doc_num_range[1]
-        for i in range(int(doc_num_start), int(doc_num_end)+1):
-            if ('_default', str(i)) in docset.keys():
-                doc = docset[('_default', str(i))]
-                coredata = doc.metadatas['coredata']
-                coredata_dict = coredata.meta_dict
-                if 'creator' in coredata_dict.keys():
-                    creator = coredata_dict['creator']
-                else:
-                    creator = 'none'
-                author_struct = {}
-                author_struct['doc_id'] = i
-                if 'doi' in coredata_dict.keys():
-                    author_struct['doc_doi'] = coredata_dict['doi']
-                else:
-                    author_struct['doc_doi'] = 'none'
-                if 'title' in coredata_dict.keys():
-                    author_struct['title'] = coredata_dict['title']
-                else:
-                    author_struct['title'] = 'none'
-                author_struct['author_number'] = 1
-                author_struct['author_list'] = [creator]
-                author_struct_array.append(author_struct)
-    return author_struct_array
+        for i in range(int(doc_num_start), int(doc_num_end) + 1):
+            doc_names.append(str(i))
+    return doc_names
+
+
+def read_source(document):
+    """return {doc_name: Document} of the documents in the document range, read from the ScienceDirect directory of config"""
+    corpus = get_corpus(config.check_get(["init", "location"]))
+    return corpus.read(parse_document_range(document))
+
+
+# the fields a record can carry; doc_id is always present
+RECORD_FIELDS = ('doi', 'title', 'authors', 'bibliography', 'text')
+
+
+def iter_records(_source, document, fields=RECORD_FIELDS):
+    """yield one dict per document in the document range (a string like 1-100_300-400), in a single pass.
+    the source name is not used, only "ScienceDirectDataSource" exists now, so every source reads it;
+    only the requested fields are filled:
+    doi -> doc_doi; title -> title; authors -> author_number, author_list;
+    bibliography -> bib_number, bib_detail; text -> text (the body text is only assembled when asked)"""
+    fields = set(fields)
+    unknown = fields.difference(RECORD_FIELDS)
+    if unknown:
+        raise ValueError(f'Unknown record fields: {sorted(unknown)}')
+
+    if 'text' not in fields:
+        yield from iter_metadata_records(document, fields)
+        return
+
+    docset = read_source(document)
+    for doc_name in parse_document_range(document):
+        if doc_name not in docset:
+            continue
+        doc = docset[doc_name]
+        coredata_dict = doc.metadatas['coredata'].meta_dict
+        record = {}
+        record['doc_id'] = int(doc_name)
+        if 'doi' in fields:
+            record['doc_doi'] = coredata_dict.get('doi', 'none')
+        if 'title' in fields:
+            record['title'] = coredata_dict.get('title', 'none')
+        if 'authors' in fields:
+            # only the first author (creator) is in the coredata now
+            record['author_number'] = 1
+            record['author_list'] = [coredata_dict.get('creator', 'none')]
+        if 'bibliography' in fields:
+            references = doc.metadatas['references'].meta_dict['bibbliography-section']['references']
+            record['bib_number'] = len(references)
+            record['bib_detail'] = references
+        if 'text' in fields:
+            record['text'] = doc.get_text()
+        yield record
+
+
+def iter_metadata_records(document, fields):
+    """iter_records without the text field, served from the metadata index"""
+    corpus = get_corpus(config.check_get(["init", "location"]))
+    metadata = corpus.read_metadata(parse_document_range(document))
+    for doc_name in parse_document_range(document):
+        if doc_name not in metadata:
+            continue
+        paper = metadata[doc_name]
+        record = {}
+        record['doc_id'] = int(doc_name)
+        if 'doi' in fields:
+            record['doc_doi'] = paper.doi if paper.doi is not None else 'none'
+        if 'title' in fields:
+            record['title'] = paper.title if paper.title is not None else 'none'
+        if 'authors' in fields:
+            record['author_number'] = 1
+            record['author_list'] = [paper.creator if paper.creator is not None else 'none']
+        if 'bibliography' in fields:
+            record['bib_number'] = len(paper.references)
+            record['bib_detail'] = paper.references
+        yield record
+
+
+def search_author(source, document):
+    """source(STRING) is the name of the database; document is a string just like 1-100_300-400"""
+    return list(iter_records(source, document, ('doi', 'title', 'authors')))
 
 
 def search_citation(source, document):
     """source(STRING) is the name of the database; document is a string just like 1-100_300-400"""
-    if source == "ScienceDirectDataSource":
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-
-    else:
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-    doc_num = document.split('_')
-    citation_struct_array = []
-    for doc_num_iter in doc_num:
-        doc_num_range = doc_num_iter.split('-')
-        doc_num_start = doc_num_range[0]
-        doc_num_end = doc_num_range[1]
-        for i in range(int(doc_num_start), int(doc_num_end)+1):
-            if ('_default', str(i)) in docset.keys():
-                doc = docset[('_default', str(i))]
-                coredata = doc.metadatas['coredata']
-                coredata_dict = coredata.meta_dict
-                ref = doc.metadatas['references']
-                ref_dict = ref.meta_dict
-                citation_struct = {}
-                citation_struct['doc_id'] = i
-                if 'doi' in coredata_dict.keys():
-                    citation_struct['doc_doi'] = coredata_dict['doi']
-                else:
-                    citation_struct['doc_doi'] = 'none'
-                if 'title' in coredata_dict.keys():
-                    citation_struct['title'] = coredata_dict['title']
-                else:
-                    citation_struct['title'] = 'none'
-                citation_struct['bib_number'] = len(ref_dict['bibbliography-section']['references'])
-                citation_struct['bib_detail'] = ref_dict['bibbliography-section']['references']
-                citation_struct_array.append(citation_struct)
-    return citation_struct_array
+    return list(iter_records(source, document, ('doi', 'title', 'bibliography')))
 
 
 def search_text(source, document):
     """source(STRING) is the name of the database; document is a string just like 1-100_300-400"""
-    if source == "ScienceDirectDataSource":
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-
-    else:
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-    doc_num = document.split('_')
-    text_struct_array = []
-    for doc_num_iter in doc_num:
-        doc_num_range = doc_num_iter.split('-')
-        doc_num_start = doc_num_range[0]
-        doc_num_end = doc_num_range[1]
-        for i in range(int(doc_num_start), int(doc_num_end)+1):
-            if ('_default', str(i)) in docset.keys():
-                doc = docset[('_default', str(i))]
-                coredata = doc.metadatas['coredata']
-                coredata_dict = coredata.meta_dict
-                text_struct = {}
-                text_struct['doc_id'] = i
-                if 'doi' in coredata_dict.keys():
-                    text_struct['doc_doi'] = coredata_dict['doi']
-                else:
-                    text_struct['doc_doi'] = 'none'
-                if 'title' in coredata_dict.keys():
-                    text_struct['title'] = coredata_dict['title']
-                else:
-                    text_struct['title'] = 'none'
-                text_struct['text'] = doc.get_text()
-                text_struct_array.append(text_struct)
-    return text_struct_array
+    return list(iter_records(source, document, ('doi', 'title', 'text')))
 
 
 def search_all(source, document):
     """source(STRING) is the name of the database; document is a string just like 1-100_300-400"""
-    if source == "ScienceDirectDataSource":
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-
-    else:
-        ds = ScienceDirectDS(config)
-        docset = ds.read_docset()
-    doc_num = document.split('_')
-    all_struct_array = []
-    for doc_num_iter in doc_num:
-        doc_num_range = doc_num_iter.split('-')
-        doc_num_start = doc_num_range[0]
-        doc_num_end = doc_num_range[1]
-        for i in range(int(doc_num_start), int(doc_num_end) + 1):
-            if ('_default', str(i)) in docset.keys():
-                doc = docset[('_default', str(i))]
-                coredata = doc.metadatas['coredata']
-                coredata_dict = coredata.meta_dict
-                creator = coredata_dict['creator']
-                ref = doc.metadatas['references']
-                ref_dict = ref.meta_dict
-                all_struct = {}
-                all_struct['doc_id'] = i
-                if 'doi' in coredata_dict.keys():
-                    all_struct['doc_doi'] = coredata_dict['doi']
-                else:
-                    all_struct['doc_doi'] = 'none'
-                if 'title' in coredata_dict.keys():
-                    all_struct['title'] = coredata_dict['title']
-                else:
-                    all_struct['title'] = 'none'
-                all_struct['author_number'] = 1
-                all_struct['author_list'] = [creator]
-                all_struct['bib_number'] = len(ref_dict['bibbliography-section']['references'])
-                all_struct['bib_detail'] = ref_dict['bibbliography-section']['references']
-                all_struct['text'] = doc.get_text()
-                all_struct_array.append(all_struct)
-    return all_struct_array
+    return list(iter_records(source, document))
 
 # if __name__ == '__main__':
     # print(search_all("ScienceDirectDataSource","1-10"))
@@ -1,13 +1,19 @@
 import unittest as ut
 
-from test.test_data_platform.doc import TestJSONDS, TestMongoDBDS  # , TestArangoDBDS
+from test.test_data_platform.doc import TestJSONDS, TestMongoDBDS, TestScienceDirectDSRead  # , TestArangoDBDS
 from test.test_data_platform.graph import TestNetworkXDS
 from test.test_data_platform.row import TestSQLiteDS
 from test.test_data_platform.config import TestConfig
+from test.test_network_construction import (TestAnnotationCache, TestCoOccurrence, TestCooccurrenceMatrix, TestCorpusCache, TestEmbeddingNeighbours,
+                                            TestGetPipeline, TestIterRecords, TestKeywordExtractor, TestNLPPipeline, TestNounPhraseChunker,
+                                            TestParallelConstruction, TestTermNormalizer, TestWord2VecRegistry, TestWordNetSimilarity)
 
 from data_platform.config import get_global_config
 
-TEST_CASES = [TestJSONDS, TestSQLiteDS, TestNetworkXDS, TestConfig]
+TEST_CASES = [TestJSONDS, TestScienceDirectDSRead, TestSQLiteDS, TestNetworkXDS, TestConfig,
+              TestNLPPipeline, TestGetPipeline, TestAnnotationCache, TestWordNetSimilarity, TestEmbeddingNeighbours, TestWord2VecRegistry,
+              TestCoOccurrence, TestCooccurrenceMatrix, TestKeywordExtractor, TestTermNormalizer,
+              TestNounPhraseChunker, TestCorpusCache, TestIterRecords, TestParallelConstruction]
 
 global_config = get_global_config()
 
@@ -2,7 +2,9 @@ import os
 import sys
 import tempfile
 import unittest as ut
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from unittest import mock
 
 from .base import BaseTestDataSource
 
@@ -67,6 +69,52 @@ SAMPLE_DOC2 = {
 }
 
 
+SAMPLE_SD_XML = '''<?xml version="1.0" encoding="UTF-8"?>
+<full-text-retrieval-response xmlns="http://www.elsevier.com/xml/svapi/article/dtd" xmlns:prism="http://prismstandard.org/namespaces/basic/2.0/"
+  xmlns:dc="http://purl.org/dc/elements/1.1/" xmlns:xocs="http://www.elsevier.com/xml/xocs/dtd" xmlns:ce="http://www.elsevier.com/xml/common/dtd"
+  xmlns:sb="http://www.elsevier.com/xml/common/struct-bib/dtd">
+  <coredata>
+    <prism:doi>10.1016/j.test.2018.01.{doc_num:03d}</prism:doi>
+    <dc:title>Knowledge networks of test papers</dc:title>
+    <dc:creator>Doe, John</dc:creator>
+    <prism:coverDate>2018-03-01</prism:coverDate>
+  </coredata>
+  <originalText><xocs:doc><xocs:serial-item><article xmlns="http://www.elsevier.com/xml/ja/dtd">
+    <head/>
+    <body><ce:sections>
+      <ce:section id="s1"><ce:section-title id="st1">Introduction</ce:section-title>
+        <ce:para id="p1">Graphs are useful <ce:cross-ref refid="b1"><ce:sup>1</ce:sup></ce:cross-ref> for knowledge.</ce:para>
+        <ce:para id="p2">We cite two works <ce:cross-refs refid="b1 b2">[1,2]</ce:cross-refs> here.</ce:para>
+      </ce:section>
+    </ce:sections></body>
+    <tail><ce:bibliography id="bib1"><ce:section-title id="bt1">References</ce:section-title>
+      <ce:bibliography-sec id="bs1">
+        <ce:bib-reference id="b1"><ce:label>[1]</ce:label>
+          <sb:reference>
+            <sb:contribution>
+              <sb:authors><sb:author><ce:given-name>Alice</ce:given-name><ce:surname>Smith</ce:surname></sb:author></sb:authors>
+              <sb:title><sb:maintitle>On graphs</sb:maintitle></sb:title>
+            </sb:contribution>
+            <sb:host>
+              <sb:issue>
+                <sb:series>
+                  <sb:title><sb:maintitle>Journal of Graphs</sb:maintitle></sb:title><sb:volume-nr>3</sb:volume-nr>
+                </sb:series>
+                <sb:date>2001</sb:date>
+              </sb:issue>
+              <sb:pages><sb:first-page>1</sb:first-page><sb:last-page>9</sb:last-page></sb:pages>
+              <ce:doi>10.1000/graphs.1</ce:doi>
+            </sb:host>
+          </sb:reference>
+        </ce:bib-reference>
+        <ce:bib-reference id="b2"><ce:label>[2]</ce:label><ce:other-ref><ce:textref>Bob Jones, Some book, 1999.</ce:textref></ce:other-ref></ce:bib-reference>
+      </ce:bibliography-sec>
+    </ce:bibliography></tail>
+  </article></xocs:serial-item></xocs:doc></originalText>
+</full-text-retrieval-response>
+'''
+
+
 class TestDocDataSource(BaseTestDataSource):
     def test_default_create(self):
         with tempfile.TemporaryDirectory(prefix='test_', suffix='_docds') as tmpdir:
@@ -134,6 +182,18 @@ class TestDocDataSource(BaseTestDataSource):
 
             del ds
 
+    def test_iter_docs(self):
+        from data_platform.datasource.abc.doc import DocKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_docds') as tmpdir:
+            ds = self.get_test_instance(tmpdir)
+            ds.create_doc(val=SAMPLE_DOC)
+            ds.create_doc([('pep', 'pep001'), ('pep', 'pep484')], SAMPLE_DOC2)
+
+            self.assertEqual(dict(ds.iter_docs(batch_size=2)), ds.read_doc())
+            self.assertEqual(list(ds.iter_docs(('pep', 'pep484'))), [(DocKeyPair('pep', 'pep484'), SAMPLE_DOC2)])
+            del ds
+
     def test_other_method(self):
         with tempfile.TemporaryDirectory(prefix='test_', suffix='_docds') as tmpdir:
             ds = self.get_test_instance(tmpdir)
@@ -176,6 +236,215 @@ class TestScienceDirectDS(TestDocDataSource):
         return ds
 
 
+class TestScienceDirectDSRead(ut.TestCase):
+    @staticmethod
+    def write_sample(location, doc_num):
+        path = Path(location) / f'{doc_num}.xml'
+        path.write_text(SAMPLE_SD_XML.format(doc_num=doc_num))
+        return path
+
+    def get_test_instance(self, temp_location):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import ScienceDirectDS
+
+        config = ConfigManager({"init": {"location": temp_location}})
+        return ScienceDirectDS(config)
+
+    def test_read(self):
+        from data_platform.datasource.abc.doc import DocKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            ds = self.get_test_instance(tmpdir)
+
+            docset = ds.read_docset(DocKeyPair('_default', '2'))
+            self.assertEqual(list(docset.keys()), [DocKeyPair('_default', '2')])
+            doc = docset[DocKeyPair('_default', '2')]
+            self.assertEqual(doc.metadatas['coredata']['doi'], '10.1016/j.test.2018.01.002')
+            self.assertEqual(doc.metadatas['bib2para'].meta_dict, {'b1': ['/root/sec_0/para_1', '/root/sec_0/para_2'], 'b2': ['/root/sec_0/para_2']})
+            self.assertEqual(doc.metadatas['references']['bibbliography-section']['references']['b1']['doi'], '10.1000/graphs.1')
+            self.assertIn('Graphs are useful[1] for knowledge.', doc.get_text())
+
+            self.assertEqual(ds.read_doc(DocKeyPair('_default', '42')), {})
+            self.assertEqual(len(ds.read_doc()), 3)
+
+    def test_selective_parse(self):
+        from data_platform.datasource.abc.doc import DocKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            ds = self.get_test_instance(tmpdir)
+
+            with mock.patch.object(type(ds), '_parse_one', wraps=ds._parse_one) as parse_one:
+                ds.read_doc([DocKeyPair('_default', '1'), DocKeyPair('_default', '3')])
+                ds.read_doc(DocKeyPair('_default', '1'))
+                self.assertCountEqual([call[0][0].stem for call in parse_one.call_args_list], ['1', '3'])
+
+    def test_parse_cache(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import ScienceDirectDS
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir, tempfile.TemporaryDirectory(prefix='test_', suffix='_cache') as cachedir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            config = ConfigManager({"init": {"location": tmpdir, "cache_location": cachedir}})
+
+            cold = ScienceDirectDS(config).read_doc()
+            self.assertEqual(ScienceDirectDS(config).cache_info().entries, 3)
+
+            warm_ds = ScienceDirectDS(config)
+            with mock.patch.object(ScienceDirectDS, '_parse_one') as parse_one:
+                self.assertEqual(warm_ds.read_doc(), cold)
+                parse_one.assert_not_called()
+
+            path = self.write_sample(tmpdir, 2)
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(warm_ds.prune_cache(), 1)
+            self.assertEqual(warm_ds.cache_info().entries, 2)
+
+    def test_parallel_parse(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import ScienceDirectDS
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 6):
+                self.write_sample(tmpdir, doc_num)
+            (Path(tmpdir) / 'broken.xml').write_text('<broken/>')
+
+            serial = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir}}))
+            parallel = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir, "workers": 2, "chunksize": 2}}))
+
+            self.assertEqual(parallel.read_doc(), serial.read_doc())
+            self.assertEqual(list(parallel.parse_errors.keys()), ['broken'])
+
+            # one pool serves every batch of an iteration
+            streaming = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir, "workers": 2}}))
+            with mock.patch('data_platform.datasource.science_direct.ProcessPoolExecutor', wraps=ProcessPoolExecutor) as pool:
+                self.assertEqual(len(list(streaming.iter_docs(batch_size=2))), 5)
+            self.assertEqual(pool.call_count, 1)
+            streaming.close()
+            self.assertIsNone(streaming._executor)
+
+    def test_iterparse(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import ScienceDirectDS
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            (Path(tmpdir) / 'broken.xml').write_text('<broken/>')
+
+            tree = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir}}))
+            stream = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir, "parser": "iterparse"}}))
+
+            self.assertEqual(stream.read_doc(), tree.read_doc())
+            self.assertEqual(list(stream.parse_errors.keys()), ['broken'])
+
+            with self.assertRaises(ValueError):
+                ScienceDirectDS(ConfigManager({"init": {"location": tmpdir, "parser": "sax"}}))
+
+    def test_metadata_index(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import ScienceDirectDS
+        from data_platform.datasource.science_direct import ChangeSet
+        from data_platform.datasource.science_direct_index import ScienceDirectIndex
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir, tempfile.TemporaryDirectory(prefix='test_', suffix='_index') as indexdir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            (Path(tmpdir) / 'broken.xml').write_text('<broken/>')
+            (Path(tmpdir) / 'nosections.xml').write_text(SAMPLE_SD_XML.format(doc_num=9).replace('ce:sections>', 'ce:other>'))
+            index = ScienceDirectIndex(tmpdir, Path(indexdir) / 'index.sqlite')
+
+            self.assertCountEqual(index.update().added, ['1', '2', '3', 'broken', 'nosections'])
+            # the files the full parse rejects are errors, so the index serves the documents the data source reads
+            self.assertCountEqual(index.errors.keys(), ['broken', 'nosections'])
+            ds = ScienceDirectDS(ConfigManager({"init": {"location": tmpdir}}))
+            ds.read_doc()
+            self.assertCountEqual(index.errors.keys(), ds.parse_errors.keys())
+
+            papers = index.read(['2', '42', 'broken', 'nosections'])
+            self.assertEqual(list(papers.keys()), ['2'])
+            self.assertEqual(papers['2'].doi, '10.1016/j.test.2018.01.002')
+            self.assertEqual(papers['2'].year, '2018')
+            full_refs = ScienceDirectDS._parse_one(Path(tmpdir) / '2.xml').metadatas['references']
+            self.assertEqual(papers['2'].references, full_refs['bibbliography-section']['references'])
+
+            path = self.write_sample(tmpdir, 3)
+            os.utime(path, ns=(0, 0))
+            (Path(tmpdir) / '1.xml').unlink()
+            reopened = ScienceDirectIndex(tmpdir, Path(indexdir) / 'index.sqlite')
+            self.assertEqual(reopened.update(), ChangeSet([], ['3'], ['1']))
+            self.assertEqual(list(reopened.read(['1', '2', '3']).keys()), ['2', '3'])
+
+            # only the requested documents are checked and extracted
+            self.write_sample(tmpdir, 4)
+            self.write_sample(tmpdir, 5)
+            path = self.write_sample(tmpdir, 2)
+            os.utime(path, ns=(0, 0))
+            with mock.patch.object(ScienceDirectIndex, '_extract', wraps=ScienceDirectIndex._extract) as extract:
+                self.assertEqual(reopened.update(['4', '3', '42']), ChangeSet(['4'], [], []))
+                self.assertEqual([call[0][0].stem for call in extract.call_args_list], ['4'])
+            self.assertEqual(list(reopened.read(['4', '5']).keys()), ['4'])
+            self.assertEqual(reopened.update(['2', '5']), ChangeSet(['5'], ['2'], []))
+
+    def test_incremental_refresh(self):
+        from data_platform.datasource import ScienceDirectDS
+        from data_platform.datasource.science_direct import ChangeSet
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 4):
+                self.write_sample(tmpdir, doc_num)
+            nested = Path(tmpdir) / 'nested'
+            nested.mkdir()
+            self.write_sample(nested, 4)
+
+            ds = self.get_test_instance(tmpdir)
+            self.assertEqual(len(ds.read_doc()), 4)
+
+            self.write_sample(nested, 5)
+            modified = self.write_sample(nested, 4)
+            os.utime(modified, ns=(0, 0))
+            (Path(tmpdir) / '3.xml').unlink()
+
+            with mock.patch.object(ScienceDirectDS, '_parse_one', wraps=ds._parse_one) as parse_one:
+                self.assertEqual(ds.refresh(), ChangeSet(added=['5'], modified=['4'], deleted=['3']))
+                self.assertCountEqual([doc_key.doc_name for doc_key in ds.read_doc()], ['1', '2', '4', '5'])
+                self.assertCountEqual([call[0][0].stem for call in parse_one.call_args_list], ['4', '5'])
+
+    def test_iter_docset(self):
+        from data_platform.datasource.abc.doc import DocKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            for doc_num in range(1, 6):
+                self.write_sample(tmpdir, doc_num)
+            ds = self.get_test_instance(tmpdir)
+
+            docs = list(ds.iter_docset(batch_size=2))
+            self.assertEqual([doc_key for doc_key, _ in docs], [DocKeyPair('_default', str(doc_num)) for doc_num in range(1, 6)])
+            self.assertEqual([doc.metadatas['coredata']['doi'][-3:] for _, doc in docs], ['001', '002', '003', '004', '005'])
+            self.assertEqual(docs[0][1].id_, DocKeyPair('_default', '1'))
+            self.assertEqual(ds._data, {})
+
+    def test_lazy_document(self):
+        from data_platform.datasource.abc.doc import DocKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as tmpdir:
+            self.write_sample(tmpdir, 1)
+            ds = self.get_test_instance(tmpdir)
+
+            doc = ds.read_docset()[DocKeyPair('_default', '1')]
+            self.assertEqual(doc.metadatas['coredata']['creator'], 'Doe, John')
+            self.assertFalse(doc.is_materialized)
+
+            paragraphs = doc.get_paragraphs()
+            self.assertTrue(doc.is_materialized)
+            self.assertIn('/root/sec_0/para_1', paragraphs)
+            self.assertEqual(paragraphs['/root/sec_0/para_1'].document_id, DocKeyPair('_default', '1'))
+
+
 class TestMongoDBDS(TestDocDataSource):
     def setUp(self):
         """Optional initalizations."""
@@ -55,6 +55,23 @@ class TestGraphDataSource(BaseTestDataSource):
 
 
 class TestNetworkXDS(TestGraphDataSource):
+    def test_bulk_create(self):
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_nxds') as tmpdir:
+            ds = self.get_test_instance(tmpdir)
+            ds.create_graph(key='bulk')
+            self.assertEqual(ds.create_nodes_from('bulk', [('a', {'name': 'A'}), ('b', {'name': 'B'}), ('c', {})]), 3)
+            self.assertEqual(ds.create_edges_from('bulk', [('a', 'b', {'count': 2}), ('c', 'b', {'count': 1})]), 2)
+
+            self.assertEqual(list(ds.read_graph('bulk')['bulk'].nodes), ['a', 'b', 'c'])
+            self.assertEqual(ds.read_node(('bulk', 'b')), {('bulk', 'b'): {'name': 'B'}})
+            self.assertEqual(ds.read_edge(('bulk', ('b', 'c'))), {('bulk', ('b', 'c')): {'count': 1}})
+
+            ds.create_edges_from('bulk', [('b', 'a', {'count': 5})])
+            self.assertEqual(ds.read_edge(('bulk', ('a', 'b'))), {('bulk', ('a', 'b')): {'count': 5}})
+
+            ds.flush()
+            del ds
+
     @classmethod
     def get_test_class(cls):
         from data_platform.datasource import NetworkXDS
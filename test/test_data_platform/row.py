@@ -177,6 +177,21 @@ class TestRowDataSource(BaseTestDataSource):
             ds.delete_table('table1')
             ds.delete_table('table2')
 
+    def test_iter_rows(self):
+        from data_platform.datasource.abc.row import RowKeyPair
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_rowds') as tmpdir:
+            ds = self.get_test_instance(tmpdir)
+            ds.create_table('table1')
+            ds.create_table('table2')
+            for row_key, row_data in chain(SAMPLE_TABLE1.items(), SAMPLE_TABLE2.items()):
+                ds.create_row(row_key, row_data)
+
+            self.assertEqual(dict(ds.iter_rows(batch_size=3)), ds.read_row())
+            self.assertEqual(dict(ds.iter_rows(RowKeyPair('table2', '@*'), batch_size=1)), ds.read_row(RowKeyPair('table2', '@*')))
+            self.assertEqual(list(ds.iter_rows([RowKeyPair('table1', 'row2'), RowKeyPair('table1', 'missing')])),
+                             [(RowKeyPair('table1', 'row2'), SAMPLE_TABLE1[('table1', 'row2')])])
+
 
 class TestSQLiteDS(TestRowDataSource):
     @classmethod
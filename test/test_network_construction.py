@@ -0,0 +1,622 @@
+import io
+import multiprocessing
+import os
+import pickle
+import re
+import sys
+import tempfile
+import unittest as ut
+from collections import Counter
+from pathlib import Path
+from unittest import mock
+
+import numpy as np
+
+root_folder = Path(os.getcwd())
+sys.path.append(str(root_folder))
+
+from gensim.models import KeyedVectors  # noqa: E402
+from network_construction.algorithm import (AnnotationCache, CoOccurrence, KeywordExtractor, NLPPipeline, TermNormalizer,  # noqa: E402
+                                            Vocabulary, WordNetSimilarity, Word2VecRegistry, embedding_neighbours)
+from test.test_data_platform.doc import SAMPLE_SD_XML  # noqa: E402
+
+# the tags of the stub tagger, every other word is a noun
+STUB_TAGS = {
+    'the': 'DT', 'a': 'DT', 'of': 'IN', 'on': 'IN', 'and': 'CC', 'is': 'VBZ', 'are': 'VBP',
+    'big': 'JJ', 'small': 'JJ', 'fast': 'JJ', 'grow': 'VB', 'run': 'VB', '.': '.',
+}
+
+
+class StubSentenceTokenizer:
+    """splits after every '.', in place of punkt"""
+    def tokenize(self, text):
+        return [sentence.strip() for sentence in re.findall(r'[^.]+\.?', text) if sentence.strip()]
+
+
+class StubTagger:
+    """tags from STUB_TAGS, in place of the perceptron tagger"""
+    def tag(self, words):
+        return [(word, STUB_TAGS.get(word.lower(), 'NN')) for word in words]
+
+    def tag_sents(self, sentences):
+        return [self.tag(words) for words in sentences]
+
+
+class StubPipeline(NLPPipeline):
+    """an NLPPipeline whose tokenizers and tagger need no nltk data"""
+    sentence_tokenizer = StubSentenceTokenizer()
+    tagger = StubTagger()
+
+    def word_tokenize(self, text):
+        return re.findall(r'\w+|[^\w\s]', text)
+
+
+class TestNLPPipeline(ut.TestCase):
+    def test_warm_up_without_data(self):
+        pipeline = StubPipeline()
+        missing = mock.Mock(side_effect=LookupError('Resource wordnet not found.'))
+        with mock.patch.object(pipeline, 'word_lemmatized', missing), mock.patch.object(pipeline, 'wordnet_similarity', missing), \
+                mock.patch('sys.stderr', new_callable=io.StringIO) as stderr:
+            self.assertIs(pipeline.warm_up(), pipeline)
+
+        warnings = stderr.getvalue()
+        self.assertIn('lemmatizer', warnings)
+        self.assertIn('wordnet', warnings)
+        self.assertNotIn('POS tagger', warnings)
+
+    def test_annotate(self):
+        pipeline = StubPipeline()
+        text = 'The big graph grows fast. Nodes of the graph\nrun on a small machine.'
+        annotation = pipeline.annotate(text)
+
+        self.assertEqual(annotation.sentences, ['The big graph grows fast.', 'Nodes of the graph\nrun on a small machine.'])
+        self.assertEqual(annotation.tagged_sentence(0), [('The', 'DT'), ('big', 'JJ'), ('graph', 'NN'), ('grows', 'NN'), ('fast', 'JJ'), ('.', '.')])
+        self.assertEqual(annotation.words_by_sentence(('NN',)), [['graph', 'grows'], ['Nodes', 'graph', 'machine']])
+        self.assertEqual(pipeline.sentence_words(annotation, 'adj'), [['big', 'fast'], ['small']])
+        self.assertEqual(pipeline.extract_nodes(annotation, 'verb'), ['run'])
+        self.assertEqual(list(annotation.paragraphs), [0, 2])
+
+    def test_annotate_without_tags(self):
+        pipeline = StubPipeline()
+        with mock.patch.object(StubTagger, 'tag_sents') as tag_sents:
+            annotation = pipeline.annotate('Graphs grow. Nodes run.', 'keyword')
+            tag_sents.assert_not_called()
+        self.assertFalse(annotation.tagged)
+        self.assertEqual(annotation.sentences, ['Graphs grow.', 'Nodes run.'])
+        with self.assertRaises(ValueError):
+            pipeline.sentence_words(annotation, 'noun')
+
+        self.assertTrue(pipeline.annotate('Graphs grow. Nodes run.', 'noun').tagged)
+        self.assertTrue(StubPipeline(np_backend='chunker').annotate('Graphs grow.', 'noun_phrase').tagged)
+
+
+class TestGetPipeline(ut.TestCase):
+    def test_options(self):
+        from network_construction import algorithm
+
+        with mock.patch.dict(algorithm._pipelines, clear=True), mock.patch.dict(algorithm._caches, clear=True), \
+                tempfile.TemporaryDirectory(prefix='test_', suffix='_cache') as tmpdir:
+            cache_path = Path(tmpdir) / 'cache.sqlite'
+            with mock.patch.object(algorithm, 'ANNOTATION_CACHE_PATH', cache_path):
+                pipeline = algorithm.get_pipeline()
+                self.assertIs(algorithm.get_pipeline(normalize=[]), pipeline)
+                self.assertIs(algorithm.get_pipeline(cache_path=str(cache_path), np_backend="textblob"), pipeline)
+
+                lowercase = algorithm.get_pipeline(normalize=['lowercase'])
+                self.assertIsNot(lowercase, pipeline)
+                self.assertEqual(lowercase.normalize, ('lowercase',))
+                # the pipelines with the same cache path share one cache
+                self.assertIs(lowercase.cache, pipeline.cache)
+                self.assertIsNone(algorithm.get_pipeline(cache_path=None).cache)
+
+                # the module defaults are read at every call
+                with mock.patch.object(algorithm, 'NP_BACKEND', "chunker"):
+                    self.assertEqual(algorithm.get_pipeline().np_backend, "chunker")
+                self.assertIs(algorithm.get_pipeline(), pipeline)
+                with self.assertRaises(ValueError):
+                    algorithm.get_pipeline(np_backend="spacy")
+            pipeline.cache.close()
+
+
+class TestAnnotationCache(ut.TestCase):
+    def test_round_trip(self):
+        annotation = StubPipeline().annotate('Big graphs grow. Small nodes run.')
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_cache') as tmpdir:
+            path = Path(tmpdir) / 'cache.sqlite'
+            cache = AnnotationCache(path, batch_size=10)
+            cache.put('text', annotation)
+            self.assertEqual(cache.get('text').tokens, annotation.tokens)
+            other = AnnotationCache(path)
+            self.assertIsNone(other.get('text'))
+
+            cache.flush()
+            cached = other.get('text')
+            self.assertEqual(cached.sentences, annotation.sentences)
+            self.assertEqual(cached.tagged_sentence(1), annotation.tagged_sentence(1))
+            self.assertEqual(list(cached.paragraphs), list(annotation.paragraphs))
+            self.assertIsNone(cache.get('other text'))
+            self.assertEqual(cache.stats(), {'hits': 1, 'misses': 1, 'entries': 1, 'size': cache.stats()['size']})
+            cache.close()
+            other.close()
+
+    def test_evict(self):
+        pipeline = StubPipeline()
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_cache') as tmpdir:
+            cache = AnnotationCache(Path(tmpdir) / 'cache.sqlite', batch_size=3)
+            cache.put('text 0', pipeline.annotate('Graphs grow.'))
+            cache.flush()
+            cache.max_size = cache.stats()['size'] * 5
+
+            for i in range(1, 20):
+                cache.put(f'text {i}', pipeline.annotate('Graphs grow.'))
+                # keep text 0 in use
+                cache.get('text 0')
+            stats = cache.stats()
+            self.assertLessEqual(stats['size'], cache.max_size)
+            self.assertEqual(stats['entries'], 5)
+            self.assertIsNotNone(cache.get('text 0'))
+            self.assertIsNotNone(cache.get('text 19'))
+            self.assertIsNone(cache.get('text 1'))
+
+            cache.clear()
+            self.assertEqual(cache.stats()['entries'], 0)
+            cache.close()
+
+    def test_finalizer(self):
+        from multiprocessing import util
+
+        def finalizers(cache):
+            return [finalizer for finalizer in util._finalizer_registry.values() if finalizer._weakref() is cache]
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_cache') as tmpdir:
+            cache = AnnotationCache(Path(tmpdir) / 'cache.sqlite')
+            # a reopened cache flushes at exit once
+            for _ in range(3):
+                cache.close()
+                self.assertEqual(finalizers(cache), [])
+                cache.get('text')
+                self.assertEqual(len(finalizers(cache)), 1)
+            cache.close()
+
+
+class StubSynset:
+    """a synset at a position on a line, the path similarity falls with the distance"""
+    def __init__(self, position):
+        self.position = position
+
+    def path_similarity(self, other):
+        return 1 / (1 + abs(self.position - other.position))
+
+
+class TestWordNetSimilarity(ut.TestCase):
+    SYNSETS = {'graph': [StubSynset(0)], 'network': [StubSynset(1)], 'node': [StubSynset(3)], 'edge': [StubSynset(4)]}
+
+    def test_relations(self):
+        # new= keeps mock.patch from inspecting the lazy wordnet loader, which would load the corpus
+        wn = mock.Mock(**{'synsets.side_effect': lambda word: self.SYNSETS.get(word, [])})
+        with mock.patch('network_construction.algorithm.wn', new=wn):
+            engine = WordNetSimilarity(str.lower, threshold=0.3, cache_size=2)
+            self.assertEqual(engine.relations(['Graph', 'network', 'the', 'node', 'Graph', 'edge']), [
+                ('Graph', 'network', 0.5), ('network', 'node', 1 / 3), ('node', 'edge', 0.5),
+            ])
+            self.assertEqual(engine.similarity('node', 'the'), 0)
+            self.assertLessEqual(engine.synset.cache_info().currsize, 2)
+            self.assertLessEqual(engine._synset_similarity.cache_info().currsize, 2)
+            self.assertGreater(wn.synsets.call_count, 5)
+
+            engine = WordNetSimilarity(str.lower, top_k=1)
+            self.assertEqual(engine.relations(['graph', 'network', 'node', 'edge']), [('graph', 'network', 0.5), ('node', 'edge', 0.5)])
+
+    def test_pipeline_options(self):
+        pipeline = StubPipeline(wordnet_threshold=0.3, wordnet_top_k=1)
+        self.assertEqual((pipeline.wordnet.threshold, pipeline.wordnet.top_k), (0.3, 1))
+        self.assertEqual((StubPipeline().wordnet.threshold, StubPipeline().wordnet.top_k), (0, None))
+
+
+class TestEmbeddingNeighbours(ut.TestCase):
+    def setUp(self):
+        self.vectors = KeyedVectors(vector_size=2)
+        self.vectors.add_vectors(['graph', 'network', 'node', 'edge', 'noise'],
+                                 np.array([[1, 0], [0.9, 0.1], [0, 1], [0.1, 0.9], [-1, 0]], dtype=np.float32))
+
+    def test_top_k(self):
+        words = ['node', 'graph', 'unknown', 'network', 'graph', 'edge', 'noise']
+        relation = embedding_neighbours(words, self.vectors, top_k=1)
+        self.assertEqual([(word1, word2) for word1, word2, _ in relation], [('node', 'edge'), ('graph', 'network')])
+        self.assertAlmostEqual(relation[1][2], 0.9 / np.hypot(0.9, 0.1), places=5)
+
+        relation = embedding_neighbours(words, self.vectors, top_k=2)
+        self.assertEqual([(word1, word2) for word1, word2, _ in relation],
+                         [('node', 'edge'), ('node', 'network'), ('graph', 'network'), ('graph', 'edge'), ('network', 'edge')])
+        self.assertEqual(embedding_neighbours(words, self.vectors, top_k=2, block_size=2), relation)
+
+    def test_too_few_words(self):
+        self.assertEqual(embedding_neighbours(['graph', 'unknown'], self.vectors), [])
+        self.assertEqual(embedding_neighbours(['graph', 'network'], self.vectors, top_k=0), [])
+
+    def test_pipeline_options(self):
+        from network_construction import algorithm
+
+        with mock.patch.object(StubPipeline, 'word_vectors', self.vectors):
+            pipeline = StubPipeline(embedding_top_k=1, embedding_block_size=2)
+            annotation = pipeline.annotate('graph network node edge noise.')
+            self.assertEqual([(word1, word2) for word1, word2, _, _ in pipeline.extract_relation_embedding(annotation, 'noun')],
+                             [('graph', 'network'), ('node', 'edge')])
+            self.assertEqual(len(StubPipeline().extract_relation_embedding(annotation, 'noun')),
+                             len(embedding_neighbours(pipeline.extract_nodes(annotation, 'noun'), self.vectors)))
+        # the options are part of the pipeline key, and reach the workers with the other options
+        options = algorithm.pipeline_options(embedding_top_k=1)
+        self.assertEqual((options['embedding_top_k'], options['embedding_block_size']), (1, algorithm.EMBEDDING_BLOCK_SIZE))
+
+
+class TestWord2VecRegistry(ut.TestCase):
+    SENTENCES = [['big', 'graphs', 'grow'], ['small', 'nodes', 'run'], ['graphs', 'link', 'nodes']]
+
+    def test_train_more(self):
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_w2v') as tmpdir:
+            path = str(Path(tmpdir) / 'test.model')
+            registry = Word2VecRegistry()
+            registry.initialize(self.SENTENCES, path, vector_size=8, workers=1)
+            # another process that loaded the model before it was trained again
+            other = Word2VecRegistry()
+            self.assertNotIn('edges', other.vectors(path))
+
+            with mock.patch('network_construction.algorithm.get_registry', return_value=registry), \
+                    mock.patch('network_construction.algorithm.WORD2VEC_MODEL', path):
+                pipeline = StubPipeline()
+                self.assertNotIn('edges', pipeline.word_vectors)
+                registry.train_more([['nodes', 'link', 'edges']], path)
+                self.assertIn('edges', pipeline.word_vectors)
+            self.assertIn('edges', other.vectors(path))
+            self.assertIn('edges', other.model(path).wv)
+            self.assertEqual(registry.lookup(['edges', 'unknown'], path).shape, (2, 8))
+
+
+class TestCoOccurrence(ut.TestCase):
+    TEXT = 'The big graph of the small network grows fast. Nodes run.\nEdges of nodes run on graphs.'
+
+    def relations(self, scope, window=5, node='noun'):
+        pipeline = StubPipeline(co_scope=scope, co_window=window)
+        annotation = pipeline.annotate(self.TEXT)
+        vocabulary = Vocabulary()
+        counts = pipeline.count_relation_co(annotation, node, vocabulary)
+        self.assertEqual(counts, CoOccurrence(scope, window).count(annotation, pipeline.sentence_words(annotation, node), Vocabulary(),
+                                                                   sentence_positions=pipeline.sentence_positions(annotation, node)))
+        words = {(vocabulary.words[id1], vocabulary.words[id2]): count for (id1, id2), count in counts.items()}
+        return [(word1, word2) for word1, word2, _ in pipeline.extract_relation_co(annotation, node)], words
+
+    def test_sentence(self):
+        relations, counts = self.relations('sentence')
+        self.assertEqual(relations, [('graph', 'network'), ('graph', 'grows'), ('network', 'grows'), ('Edges', 'nodes'), ('Edges', 'graphs'),
+                                     ('nodes', 'graphs')])
+        self.assertEqual(sum(counts.values()), 6)
+        # the pairs are counted in the order of extract_relation_co
+        self.assertEqual(list(counts), relations)
+
+    def test_window(self):
+        # graph, network and grows are the tokens 2, 6 and 7: the determiners and adjectives between them count
+        relations, _ = self.relations('window')
+        self.assertEqual(relations, [('graph', 'network'), ('network', 'grows'), ('Edges', 'nodes'), ('nodes', 'graphs')])
+        relations, _ = self.relations('window', 6)
+        self.assertIn(('graph', 'grows'), relations)
+        self.assertEqual(self.relations('window', 2, 'adj')[0], [])
+        self.assertEqual(self.relations('window', 4, 'adj')[0], [('small', 'fast')])
+        self.assertEqual(self.relations('window', 5, 'adj')[0], [('big', 'small'), ('small', 'fast')])
+
+    def test_paragraph(self):
+        relations, counts = self.relations('paragraph')
+        self.assertEqual(relations[:6], [('graph', 'network'), ('graph', 'grows'), ('graph', 'Nodes'), ('network', 'grows'), ('network', 'Nodes'),
+                                         ('grows', 'Nodes')])
+        self.assertEqual(len(relations), 9)
+        self.assertEqual(sum(counts.values()), 9)
+
+    def test_unknown_scope(self):
+        with self.assertRaises(ValueError):
+            CoOccurrence('document')
+        with self.assertRaises(ValueError):
+            StubPipeline(co_scope='document')
+
+    def test_merge_relations(self):
+        from network_construction.relation import document_relations, merge_relations
+        pipeline = StubPipeline()
+        vocabulary = Vocabulary()
+        texts = ('graphs of nodes. nodes of graphs.', 'nodes of edges.')
+        results = [document_relations(pipeline, pipeline.annotate(text), 'noun', 'co', vocabulary) for text in texts]
+        # the words are counted on their ids, and become node keys again when merged
+        self.assertEqual(vocabulary.words, ['graphs', 'nodes', 'edges'])
+        self.assertEqual([dict(counts) for counts, _ in results], [{(0, 1): 2}, {(1, 2): 1}])
+        self.assertEqual(merge_relations(results, vocabulary), [('word_graphs', 'word_nodes', {'relation': 'co', 'count': 2}),
+                                                                ('word_nodes', 'word_edges', {'relation': 'co', 'count': 1})])
+
+    def test_matrix_follows_pipeline(self):
+        from network_construction.matrix import CooccurrenceMatrix
+        matrix = CooccurrenceMatrix('noun', pipeline=StubPipeline(co_scope='window', co_window=3))
+        self.assertEqual((matrix.scope, matrix.window), ('window', 3))
+
+
+class TestCooccurrenceMatrix(ut.TestCase):
+    TEXTS = ['Graph of nodes. Graph of nodes and edges.', 'Big graphs grow. Nodes run on a small machine.\nMachine and nodes.']
+
+    def matrix(self, scope='sentence', window=None):
+        from network_construction.matrix import CooccurrenceMatrix
+        pipeline = StubPipeline()
+        return CooccurrenceMatrix('noun', scope, window, pipeline).add_all(pipeline.iter_annotations(self.TEXTS, 'noun'))
+
+    def counts(self, matrix):
+        counts = matrix.matrix.tocoo()
+        return {(matrix.vocabulary[i], matrix.vocabulary[j]): count for i, j, count in zip(counts.row, counts.col, counts.data)}
+
+    def test_counts(self):
+        for scope, window in (('sentence', None), ('window', 3), ('paragraph', None)):
+            pipeline = StubPipeline(co_scope=scope, co_window=window or 5)
+            expected = Counter()
+            vocabulary = Vocabulary()
+            for annotation in pipeline.iter_annotations(self.TEXTS, 'noun'):
+                pipeline.count_relation_co(annotation, 'noun', vocabulary, expected)
+            # the matrix orders a pair by the ids of its words, CoOccurrence by their first occurrence
+            self.assertEqual({frozenset(pair): count for pair, count in self.counts(self.matrix(scope, window)).items()},
+                             {frozenset(vocabulary.words[word_id] for word_id in pair): count for pair, count in expected.items()})
+        self.assertEqual(self.counts(self.matrix())[('Graph', 'nodes')], 2)
+
+    def test_pmi(self):
+        from network_construction.matrix import CooccurrenceMatrix
+        pipeline = StubPipeline()
+        matrix = CooccurrenceMatrix('noun', pipeline=pipeline).add(pipeline.annotate(self.TEXTS[0]))
+        # (Graph, nodes) 2, (Graph, edges) 1, (nodes, edges) 1: the marginals are 3, 3, 2 of 8
+        self.assertEqual(matrix.vocabulary, ['Graph', 'nodes', 'edges'])
+        pmi = matrix.pmi().toarray()
+        npmi = matrix.pmi(normalized=True).toarray()
+        self.assertAlmostEqual(pmi[0, 1], np.log((2 / 8) / (3 / 8) ** 2))
+        self.assertAlmostEqual(pmi[0, 2], np.log((1 / 8) / (3 / 8) / (2 / 8)))
+        self.assertAlmostEqual(npmi[0, 1], np.log((2 / 8) / (3 / 8) ** 2) / -np.log(2 / 8))
+        self.assertEqual(pmi[1, 0], 0)
+        with self.assertRaises(ValueError):
+            list(matrix.edges('tfidf'))
+
+    def test_to_database(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import NetworkXDS
+        from network_construction import database
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_nxds') as graphdir:
+            nxds = NetworkXDS(ConfigManager({"init": {"location": graphdir}}))
+            with mock.patch.object(database, 'nxds', nxds):
+                database.create_database('co')
+                matrix = self.matrix()
+                matrix.to_database('co', 'npmi')
+                graph = nxds.read_graph('co')['co']
+                self.assertEqual(graph.number_of_nodes(), len(matrix.vocabulary))
+                self.assertEqual(graph.edges['word_Graph', 'word_nodes']['count'], 2)
+                npmi = graph.edges['word_Graph', 'word_nodes']['npmi']
+
+                # a second write adds the counts and keeps the rest of the struct
+                matrix.to_database('co')
+                self.assertEqual(graph.edges['word_Graph', 'word_nodes'], {'relation': 'co', 'count': 4, 'npmi': npmi})
+                self.assertEqual(graph.number_of_edges(), len(self.counts(matrix)))
+            del nxds
+
+
+class TestKeywordExtractor(ut.TestCase):
+    STOPWORDS = {'the', 'a', 'of', 'on', 'and', 'is', 'are', 'with'}
+    SENTENCES = ['The big graph of the network is fast, and small.', 'Nodes run on a machine (with 2 GPUs) -- graph edges!', 'the of and']
+
+    def test_same_as_rake(self):
+        from nltk.tokenize import wordpunct_tokenize
+        from rake_nltk import Rake
+
+        extractor = KeywordExtractor(stopwords=self.STOPWORDS)
+        rake = Rake(stopwords=self.STOPWORDS, sentence_tokenizer=lambda text: [text], word_tokenizer=wordpunct_tokenize)
+        for sentence, keywords in zip(self.SENTENCES, extractor.keywords_many(self.SENTENCES)):
+            rake.extract_keywords_from_text(sentence)
+            self.assertEqual(keywords, list(rake.get_word_degrees()))
+        self.assertEqual(extractor.keywords(self.SENTENCES[0]), ['big', 'graph', 'network', 'fast', 'small'])
+        self.assertEqual(extractor.keywords(self.SENTENCES[2]), [])
+
+
+class TestTermNormalizer(ut.TestCase):
+    @staticmethod
+    def lemmatize(word):
+        # a plural is its singular, in place of the wordnet lemmatizer
+        return word[:-1] if word.endswith('s') and len(word) > 3 else word
+
+    def test_steps(self):
+        from nltk.stem import PorterStemmer
+
+        words = ['Shops', 'the', 'shop', 'The running Shops', 'of']
+        self.assertEqual(TermNormalizer(())(words), words)
+        self.assertEqual(TermNormalizer(('lowercase',))(words), ['shops', 'the', 'shop', 'the running shops', 'of'])
+        # the steps run in NORMALIZE_STEPS order whatever order they are given in
+        normalizer = TermNormalizer(('lemmatize', 'stopwords', 'lowercase'), lemmatize=self.lemmatize, stopwords={'the', 'of'})
+        self.assertEqual(normalizer.steps, ('lowercase', 'stopwords', 'lemmatize'))
+        self.assertEqual(normalizer(words), ['shop', 'shop', 'the running shop'])
+        # stopwords are matched case-insensitively, phrases word by word
+        normalizer = TermNormalizer(('stopwords', 'stem'), stem=PorterStemmer().stem, stopwords={'the'})
+        self.assertEqual(normalizer(words), ['shop', 'shop', 'the run shop', 'of'])
+        with self.assertRaises(ValueError):
+            TermNormalizer(('lowercase', 'spellcheck'))
+
+    def test_cache(self):
+        lemmatize = mock.Mock(side_effect=self.lemmatize)
+        normalizer = TermNormalizer(('lemmatize',), lemmatize=lemmatize, cache_size=2)
+        self.assertEqual(normalizer(['graphs', 'graphs', 'nodes', 'graphs']), ['graph', 'graph', 'node', 'graph'])
+        self.assertEqual(lemmatize.call_count, 2)
+        normalizer(['edges', 'graphs'])
+        self.assertLessEqual(normalizer.normalize.cache_info().currsize, 2)
+
+    def test_pipeline(self):
+        pipeline = StubPipeline(normalize=('lowercase', 'stopwords'))
+        pipeline._normalizer = TermNormalizer(pipeline.normalize, stopwords={'machine'})
+        annotation = pipeline.annotate('The Graph of the machine grows. Graphs run on a machine.')
+        self.assertEqual(pipeline.sentence_words(annotation, 'noun'), [['graph', 'grows'], ['graphs']])
+        # the positions of the dropped words are dropped with them
+        self.assertEqual(pipeline.sentence_positions(annotation, 'noun'), [[1, 5], [0]])
+
+
+class TestNounPhraseChunker(ut.TestCase):
+    # (word, tag, IOB tag) of the hand chunked training sentences
+    TRAIN = [
+        [('The', 'DT', 'B-NP'), ('big', 'JJ', 'I-NP'), ('graph', 'NN', 'I-NP'), ('grows', 'VBZ', 'O'), ('.', '.', 'O')],
+        [('A', 'DT', 'B-NP'), ('network', 'NN', 'I-NP'), ('of', 'IN', 'O'), ('the', 'DT', 'B-NP'), ('small', 'JJ', 'I-NP'),
+         ('nodes', 'NNS', 'I-NP'), ('runs', 'VBZ', 'O'), ('on', 'IN', 'O'), ('Mars', 'NNP', 'B-NP'), ('.', '.', 'O')],
+    ]
+
+    def setUp(self):
+        import nltk
+        from network_construction.algorithm import UnigramChunker
+        self.chunker = UnigramChunker([nltk.chunk.conlltags2tree(sentence) for sentence in self.TRAIN])
+
+    def test_chunk(self):
+        from network_construction.algorithm import chunk_noun_phrases
+        tagged = [('The', 'DT'), ('fast', 'JJ'), ('machine', 'NN'), ('grows', 'VBZ'), ('on', 'IN'), ('Mars', 'NNP'), ('.', '.')]
+        self.assertEqual(chunk_noun_phrases(self.chunker, tagged), ['fast machine', 'mars'])
+        # a single common noun, and a chunk without a noun, are not noun phrases
+        self.assertEqual(chunk_noun_phrases(self.chunker, [('the', 'DT'), ('graph', 'NN'), ('runs', 'VBZ')]), [])
+        self.assertEqual(chunk_noun_phrases(self.chunker, [('the', 'DT'), ('big', 'JJ'), ('.', '.')]), [])
+
+    def test_pipeline(self):
+        from network_construction.algorithm import load_np_chunker
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_chunker') as tmpdir:
+            path = Path(tmpdir) / 'np_chunker.pickle'
+            path.write_bytes(pickle.dumps(self.chunker))
+            with mock.patch('network_construction.algorithm.NP_CHUNKER_PATH', path):
+                pipeline = StubPipeline(np_backend='chunker')
+                annotation = pipeline.annotate('The big graph is on a small machine. Graphs run.', 'noun_phrase')
+                self.assertEqual(pipeline.sentence_words(annotation, 'noun_phrase'), [['big graph', 'small machine'], []])
+            self.assertEqual(load_np_chunker(path).parse([('Mars', 'NNP')]).leaves(), [('Mars', 'NNP')])
+
+
+class TestCorpusCache(ut.TestCase):
+    def test_lru(self):
+        from network_construction import source
+
+        with mock.patch.object(source, '_corpus_cache', source.OrderedDict()), mock.patch.object(source, 'CORPUS_CACHE_SIZE', 2), \
+                tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as xmldir:
+            for name in 'abc':
+                (Path(xmldir) / name).mkdir()
+            first = source.get_corpus(Path(xmldir) / 'a')
+            second = source.get_corpus(Path(xmldir) / 'b')
+            self.assertIs(source.get_corpus(str(Path(xmldir) / 'a')), first)
+            # b is now the least recently used one
+            source.get_corpus(Path(xmldir) / 'c')
+            self.assertIs(source.get_corpus(Path(xmldir) / 'a'), first)
+            self.assertIsNot(source.get_corpus(Path(xmldir) / 'b'), second)
+            self.assertEqual(len(source._corpus_cache), 2)
+
+    def test_reload_changed(self):
+        from network_construction import source
+
+        with mock.patch.object(source, '_corpus_cache', source.OrderedDict()), tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as xmldir:
+            for doc_num in (1, 2):
+                (Path(xmldir) / f'{doc_num}.xml').write_text(SAMPLE_SD_XML.format(doc_num=doc_num))
+            corpus = source.get_corpus(xmldir)
+            docs = corpus.read(['1', '2', '3'])
+            self.assertEqual(sorted(docs), ['1', '2'])
+            self.assertIs(corpus.read(['1'])['1'], docs['1'])
+
+            # a touched file is parsed again, the others are kept
+            path = Path(xmldir) / '1.xml'
+            mtime = path.stat().st_mtime
+            os.utime(path, (mtime + 10, mtime + 10))
+            again = corpus.read(['1', '2'])
+            self.assertIsNot(again['1'], docs['1'])
+            self.assertIs(again['2'], docs['2'])
+
+            source.invalidate_corpus(xmldir)
+            self.assertIsNot(source.get_corpus(xmldir), corpus)
+            source.invalidate_corpus()
+            self.assertEqual(len(source._corpus_cache), 0)
+
+
+class TestIterRecords(ut.TestCase):
+    def test_fields(self):
+        from data_platform.config import ConfigManager
+        from network_construction import source
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as xmldir, tempfile.TemporaryDirectory(prefix='test_', suffix='_index') as indexdir:
+            for doc_num in (1, 2):
+                (Path(xmldir) / f'{doc_num}.xml').write_text(SAMPLE_SD_XML.format(doc_num=doc_num))
+            # the full parse rejects a document without sections, the metadata index has to leave it out too
+            (Path(xmldir) / '3.xml').write_text(SAMPLE_SD_XML.format(doc_num=3).replace('ce:sections>', 'ce:other>'))
+            with mock.patch.object(source, 'config', ConfigManager({"init": {"location": xmldir}})), mock.patch.object(source, 'index_path', Path(indexdir)), \
+                    mock.patch.object(source, '_corpus_cache', source.OrderedDict()), \
+                    mock.patch.object(source.Corpus, 'read', autospec=True, side_effect=source.Corpus.read) as read, \
+                    mock.patch.object(source.Corpus, 'read_metadata', autospec=True, side_effect=source.Corpus.read_metadata) as read_metadata:
+                # without text the records come from the metadata index, the documents are not parsed
+                records = list(source.iter_records('ScienceDirectDataSource', '1-3', ('doi', 'title')))
+                self.assertEqual([record['doc_id'] for record in records], [1, 2])
+                self.assertEqual(set(records[0]), {'doc_id', 'doc_doi', 'title'})
+                read_metadata.assert_called_once()
+                read.assert_not_called()
+
+                # text needs the full parse
+                records = list(source.iter_records('ScienceDirectDataSource', '1-3', ('text', 'bibliography')))
+                self.assertEqual([record['doc_id'] for record in records], [1, 2])
+                self.assertEqual(set(records[0]), {'doc_id', 'text', 'bib_number', 'bib_detail'})
+                self.assertIn('for knowledge', records[0]['text'])
+                read.assert_called_once()
+                read_metadata.assert_called_once()
+
+                # both paths give the same metadata
+                metadata_fields = ('doi', 'title', 'authors', 'bibliography')
+                full = [{key: value for key, value in record.items() if key != 'text'} for record in source.search_all('ScienceDirectDataSource', '1-3')]
+                self.assertEqual(list(source.iter_records('ScienceDirectDataSource', '1-3', metadata_fields)), full)
+                with self.assertRaises(ValueError):
+                    list(source.iter_records('ScienceDirectDataSource', '1-2', ('doi', 'abstract')))
+
+
+class TestParallelConstruction(ut.TestCase):
+    # replaces 'for knowledge' in the first paragraph of SAMPLE_SD_XML
+    TEXTS = [
+        'for big networks. Small nodes link fast edges',
+        'for graphs. Big graphs grow and small graphs run',
+        'for edges of networks. Nodes of small graphs link nodes',
+        'for fast machines. Machines run graphs on big networks',
+    ]
+
+    def test_parallel_equals_serial(self):
+        from data_platform.config import ConfigManager
+        from data_platform.datasource import NetworkXDS
+        from network_construction import algorithm, database, network, source
+
+        if multiprocessing.get_start_method() != 'fork':
+            self.skipTest('the workers get the stub pipeline by fork')
+
+        with tempfile.TemporaryDirectory(prefix='test_', suffix='_sdds') as xmldir, tempfile.TemporaryDirectory(prefix='test_', suffix='_nxds') as graphdir:
+            for doc_num, text in enumerate(self.TEXTS, 1):
+                (Path(xmldir) / f'{doc_num}.xml').write_text(SAMPLE_SD_XML.format(doc_num=doc_num).replace('for knowledge', text))
+            nxds = NetworkXDS(ConfigManager({"init": {"location": graphdir}}))
+
+            # every noun of TEXTS, on a circle so that neighbours are the nearby words
+            words = ['networks', 'Small', 'nodes', 'edges', 'graphs', 'Big', 'machines', 'Machines', 'Nodes']
+            angles = np.arange(len(words)) / len(words) * np.pi
+            vectors = KeyedVectors(vector_size=2)
+            vectors.add_vectors(words, np.stack([np.cos(angles), np.sin(angles)], axis=1).astype(np.float32))
+            registry = mock.Mock(**{'vectors.return_value': vectors})
+
+            with mock.patch.object(source, 'config', ConfigManager({"init": {"location": xmldir}})), \
+                    mock.patch.object(database, 'nxds', nxds), mock.patch.object(algorithm, 'NLPPipeline', StubPipeline), \
+                    mock.patch.object(algorithm, 'ANNOTATION_CACHE_PATH', None), mock.patch.dict(algorithm._pipelines, clear=True), \
+                    mock.patch.object(algorithm, 'get_registry', return_value=registry):
+                for node, relation, options in (('noun', 'co', {}), ('adj', 'co', {}), ('noun', 'co', {'normalize': ('lowercase',)}),
+                                                ('noun', 'embedding', {'embedding_top_k': 2})):
+                    name = node + ('' if relation == 'co' else relation) + ''.join(options)
+                    for workers in (0, 3):
+                        database.create_database(f'{name}_{workers}')
+                        network.create_network_text('ScienceDirectDataSource', '1-4', node, relation, f'{name}_{workers}', workers=workers, **options)
+
+                    serial = nxds.read_graph(f'{name}_0')[f'{name}_0']
+                    parallel = nxds.read_graph(f'{name}_3')[f'{name}_3']
+                    self.assertGreater(serial.number_of_edges(), 0)
+                    self.assertEqual(list(parallel.nodes(data=True)), list(serial.nodes(data=True)))
+                    self.assertEqual(list(parallel.edges(data=True)), list(serial.edges(data=True)))
+                self.assertIn('word_Nodes', nxds.read_graph('noun_0')['noun_0'])
+                self.assertNotIn('word_Nodes', nxds.read_graph('nounnormalize_3')['nounnormalize_3'])
+                self.assertIn('word_nodes', nxds.read_graph('nounnormalize_3')['nounnormalize_3'])
+
+            source.invalidate_corpus(xmldir)
+            nxds.flush()
+            del nxds
+
+
+if __name__ == '__main__':
+    ut.main()